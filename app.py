@@ -1,20 +1,38 @@
-from flask import Flask, render_template, jsonify
-from datetime import datetime, timedelta
-import requests
+from flask import Flask, render_template, jsonify, request, make_response, Response
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 import os
 import time
 from dotenv import load_dotenv
 from apscheduler.schedulers.background import BackgroundScheduler
 import logging
-from googleapiclient.discovery import build
-from calendar_setup import get_calendar_credentials, refresh_credentials
+from calendar_setup import calendar_client, refresh_credentials
+from calendar_sync import CalendarSync, format_event
 from config_manager import ConfigManager
-from middleware import rate_limit, security_headers, cache_control, validate_request, performance_monitor, https_redirect
+from middleware import rate_limit, security_headers, cache_control, conditional_get, validate_request, performance_monitor, https_redirect
 from flask_compress import Compress
+from fetch_engine import TokenBucket, SlidingWindowLimiter, fetch_concurrently
+from provider_client import get_client, connection_stats
+from http_cache import HTTPCache
+from page_cache import page_cache
+from event_stream import Broadcaster, format_sse
+from coordination import LeaderLock, SharedStateStore
+from cache_snapshot import CacheSnapshot
+from cache_entry import CacheEntry
+from metrics import registry as metrics_registry, timed
+from circuit_breaker import get_breaker, breaker_states
+from refresh_jobs import RefreshJobs, RefreshFailed
+from quote_providers import FinnhubQuoteProvider, BatchQuoteProvider
+from news_pipeline import NewsPipeline, parse_news_feeds, DEFAULT_NEWS_FEEDS
+from weather_service import WeatherService, Geocoder, parse_locations
+from boards import load_board_config, parse_boards, union_feeds, union_symbols
 import json
 import os.path
 import sys
 import pytz
+import tempfile
+import threading
+import uuid
 
 # Set up logging to both file and console
 logging.basicConfig(
@@ -68,6 +86,30 @@ try:
     config_manager = ConfigManager()
     scheduler = None  # Global scheduler instance
 
+    # Circuit breakers: fail fast once a provider keeps erroring or timing out
+    breaker_settings = {
+        'failure_rate': float(os.getenv('CIRCUIT_FAILURE_RATE', '0.5')),
+        'minimum_calls': int(os.getenv('CIRCUIT_MINIMUM_CALLS', '5')),
+        'window': int(os.getenv('CIRCUIT_WINDOW', '20')),
+        'open_seconds': int(os.getenv('CIRCUIT_OPEN_SECONDS', '120')),
+        'half_open_calls': int(os.getenv('CIRCUIT_HALF_OPEN_CALLS', '1')),
+        'slow_call_seconds': float(os.getenv('CIRCUIT_SLOW_CALL_SECONDS', '15'))
+    }
+
+    # Upstream response cache shared by the weather and news fetchers (HTTP_CACHE_DIR keeps it across restarts)
+    http_cache = HTTPCache(max_bytes=int(os.getenv('HTTP_CACHE_MAX_BYTES', str(8 * 1024 * 1024))),
+                           directory=os.getenv('HTTP_CACHE_DIR') or None)
+
+    # Pooled keep-alive HTTP clients, one per upstream provider
+    weather_client = get_client('openweathermap', breaker=get_breaker('openweathermap', **breaker_settings),
+                                http_cache=http_cache)
+    news_client = get_client('newsapi', breaker=get_breaker('newsapi', **breaker_settings),
+                             http_cache=http_cache)
+
+    # Named dashboard profiles served at /board/<name> (BOARDS: inline JSON or a JSON file path).
+    # Their symbols, cities, feeds and calendars are folded into the shared fetches below.
+    boards = parse_boards(load_board_config(os.getenv('BOARDS')))
+
     # Cache for storing data
     cache = {
         'weather': {'loading': True},
@@ -77,40 +119,406 @@ try:
         'last_update': None
     }
 
+    CACHE_SECTIONS = ('weather', 'stocks', 'calendar', 'news')
+
+    # Freshness bookkeeping per section. The TTL is how long data counts as fresh;
+    # when refreshes fail the last good value keeps being served until it is older
+    # than the max staleness.
+    cache_max_stale = int(os.getenv('CACHE_MAX_STALENESS_SECONDS', str(24 * 3600)))
+    # Batched quotes are cheap enough to refresh every few seconds
+    stocks_refresh_seconds = int(os.getenv('STOCKS_REFRESH_SECONDS',
+                                           '15' if os.getenv('QUOTE_PROVIDER', 'finnhub').lower() == 'batch' else '3600'))
+    # Quotes stay fresh for one refresh interval plus time for the next refresh to land;
+    # this also keeps the failure backoff (capped at half the TTL) in step with the interval
+    stocks_ttl_seconds = int(os.getenv('STOCKS_TTL_SECONDS',
+                                       str(stocks_refresh_seconds + min(stocks_refresh_seconds, 60))))
+    cache_entries = {
+        'weather': CacheEntry(ttl=int(os.getenv('WEATHER_TTL_SECONDS', '300')), max_stale=cache_max_stale),
+        'stocks': CacheEntry(ttl=stocks_ttl_seconds, max_stale=cache_max_stale),
+        'calendar': CacheEntry(ttl=int(os.getenv('CALENDAR_TTL_SECONDS', '900')), max_stale=cache_max_stale),
+        'news': CacheEntry(ttl=int(os.getenv('NEWS_TTL_SECONDS', '1800')), max_stale=cache_max_stale)
+    }
+
+    def record_refresh(section, value=None, error=None):
+        """Record a refresh outcome and set the value the dashboard serves"""
+        entry = cache_entries[section]
+        if error is None:
+            entry.record_success(value)
+        else:
+            entry.record_failure(error)
+            if entry.has_value():
+                logger.warning(f"{section} refresh failed ({error}), serving data from {entry.describe()['age_text']}")
+        placeholder = {'error': True, 'message': error} if section == 'calendar' else {'error': True}
+        cache[section] = entry.served_value(placeholder)
+
+    def refresh_due(section, force=False):
+        """False while a section is backing off after failed refreshes; explicit refreshes don't wait"""
+        entry = cache_entries[section]
+        if entry.in_backoff() and not force:
+            logger.info(f"Skipping {section} refresh, backing off after {entry.failures} failures")
+            return False
+        return True
+
+    def raise_if_failed(section):
+        """Let RefreshJobs report a refresh as failed once its failure has been recorded"""
+        error = cache_entries[section].last_error
+        if error is not None:
+            raise RefreshFailed(error)
+
+    def section_freshness():
+        return {section: entry.describe() for section, entry in cache_entries.items()}
+
+    # Leader election across gunicorn workers: only the process holding the file
+    # lock runs the provider jobs and publishes each section to a shared SQLite
+    # store; the other workers follow that store.
+    leader_election = os.getenv('SCHEDULER_LEADER_ELECTION', 'true').lower() == 'true'
+    shared_state_dir = os.getenv('SHARED_STATE_DIR', os.path.join(tempfile.gettempdir(), 'adydash'))
+    shared_sync_seconds = float(os.getenv('SHARED_SYNC_SECONDS', '1'))
+    leader_lock = None
+    shared_store = None
+    if leader_election:
+        try:
+            os.makedirs(shared_state_dir, exist_ok=True)
+            leader_lock = LeaderLock(os.path.join(shared_state_dir, 'scheduler.lock'))
+            shared_store = SharedStateStore(os.path.join(shared_state_dir, 'cache.sqlite3'))
+            logger.info(f"Leader election enabled using {shared_state_dir}")
+        except Exception as e:
+            logger.error(f"Could not open shared state in {shared_state_dir}, leader election disabled: {str(e)}")
+            leader_lock = None
+            shared_store = None
+
+    def is_leader():
+        return leader_lock is None or leader_lock.is_leader
+
+    # On-disk snapshot of the last good data for each section, loaded at startup
+    cache_snapshot = None
+    try:
+        cache_snapshot = CacheSnapshot(os.getenv(
+            'CACHE_SNAPSHOT_DIR',
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache_snapshot')
+        ))
+    except Exception as e:
+        logger.error(f"Cache snapshots disabled: {str(e)}")
+
+    # Generation counter bumped on every cache write; drives ETag / Last-Modified.
+    # Each section remembers the generation of its own last write so clients can
+    # tell which widgets changed. The boot id keeps ETags from a previous process
+    # from matching after a restart; with a shared store every worker uses the
+    # store's epoch so their ETags agree. That epoch outlives restarts, so the
+    # counter continues from the store's highest generation instead of 0.
+    startup_time = datetime.now(timezone.utc)
+    cache_generation = {
+        'boot_id': shared_store.epoch() if shared_store else format(int(time.time()), 'x'),
+        'value': shared_store.max_generation() if shared_store else 0,
+        'modified': startup_time,
+        'sections': {section: {'value': 0, 'modified': startup_time} for section in CACHE_SECTIONS}
+    }
+    generation_lock = threading.Lock()
+
+    def bump_generation(section):
+        """Record that a cache section changed and return the new generation"""
+        with generation_lock:
+            cache_generation['value'] += 1
+            cache_generation['modified'] = datetime.now(timezone.utc)
+            cache_generation['sections'][section] = {
+                'value': cache_generation['value'],
+                'modified': cache_generation['modified']
+            }
+            return cache_generation['value'], cache_generation['modified']
+
+    def current_generation(section=None):
+        """Return (generation, modified) for the whole cache or one section"""
+        with generation_lock:
+            info = cache_generation['sections'][section] if section else cache_generation
+            return info['value'], info['modified']
+
+    def section_generations():
+        with generation_lock:
+            return {section: info['value'] for section, info in cache_generation['sections'].items()}
+
+    def cache_etag(generation):
+        return f"{cache_generation['boot_id']}-{generation}"
+
+    def parse_event_id(value):
+        """Turn a '<boot_id>-<generation>' event id back into a generation.
+
+        Ids from another process (or garbage) map to 0 so the client gets a full catch-up.
+        """
+        boot_id, _, generation = (value or '').partition('-')
+        if boot_id != cache_generation['boot_id'] or not generation.isdigit():
+            return 0
+        return int(generation)
+
+    # Shared Server-Sent Events broadcaster for cache deltas. Each stream holds a
+    # worker thread for its whole lifetime, so subscribers are capped below the
+    # thread count (WEB_THREADS, which startup.txt also passes to gunicorn) with
+    # SSE_RESERVED_THREADS left for pages, the API and health checks.
+    web_threads = int(os.getenv('WEB_THREADS', '64'))
+    sse_thread_budget = max(1, web_threads - int(os.getenv('SSE_RESERVED_THREADS', '16')))
+    sse_max_clients = int(os.getenv('SSE_MAX_CLIENTS', str(sse_thread_budget)))
+    if sse_max_clients > sse_thread_budget:
+        logger.warning(f"SSE_MAX_CLIENTS={sse_max_clients} would starve the {web_threads} worker threads, "
+                       f"capping event streams at {sse_thread_budget}")
+        sse_max_clients = sse_thread_budget
+    broadcaster = Broadcaster(max_subscribers=sse_max_clients)
+
+    def delta_event(section):
+        """Build the SSE message announcing a section's current state"""
+        generation, modified = current_generation(section)
+        page = page_cache.get(f'widget:{section}')
+        return format_sse({
+            'section': section,
+            'generation': generation,
+            'updated': modified.isoformat(),
+            'data': cache[section],
+            'freshness': cache_entries[section].describe(),
+            'html': page.encodings['identity'].decode('utf-8') if page else None
+        }, event='delta', event_id=cache_etag(generation))
+
+    # Per-widget warm status: a section is warm once its first refresh has finished
+    readiness = {section: {'warm': False, 'ok': False, 'warmed_at': None} for section in CACHE_SECTIONS}
+
+    def section_ok(section):
+        value = cache[section]
+        return not (isinstance(value, dict) and (value.get('error') or value.get('loading')))
+
+    def mark_warm(section):
+        ok = section_ok(section)
+        with generation_lock:
+            state = readiness[section]
+            if not state['warm']:
+                state['warm'] = True
+                state['warmed_at'] = datetime.now(timezone.utc).isoformat()
+            state['ok'] = ok
+
+    def publish_cache_update(section):
+        """Bump the generation for a cache section and re-render what depends on it"""
+        generation, modified = bump_generation(section)
+        if shared_store is not None and is_leader():
+            try:
+                record = {
+                    'value': cache[section],
+                    'fetched_at': cache_entries[section].fetched_at,
+                    'last_error': cache_entries[section].last_error
+                }
+                if section == 'calendar' and board_calendars:
+                    record['board_calendars'] = dict(board_calendars)
+                shared_store.write(section, record, generation, modified.timestamp())
+            except Exception as e:
+                logger.error(f"Error publishing {section} to shared store: {str(e)}")
+        if cache_snapshot is not None and is_leader() and section_ok(section):
+            try:
+                cache_snapshot.save(section, cache[section], cache_entries[section].fetched_at)
+            except Exception as e:
+                logger.error(f"Error saving {section} snapshot: {str(e)}")
+        refresh_section(section, generation, modified)
+
+    def refresh_section(section, generation, modified):
+        """Re-render and broadcast a cache section that just changed"""
+        mark_warm(section)
+        render_page(f'widget:{section}', f'widgets/{section}.html', generation, modified)
+        render_index_page(generation, modified)
+        broadcaster.publish(section, delta_event(section))
+
+    def load_cache_snapshot():
+        """Serve the last persisted data straight away, marked stale until refreshed"""
+        if shared_store is not None and shared_store.max_generation():
+            # The store is at least as new as the snapshots, and its generations
+            # are the ones every worker agrees on
+            sync_from_shared_store()
+            return
+        if cache_snapshot is None:
+            return
+        for section in CACHE_SECTIONS:
+            record = cache_snapshot.load(section)
+            if record is None:
+                continue
+            value, fetched_at = record
+            entry = cache_entries[section]
+            entry.restore(value, fetched_at, from_snapshot=True)
+            if not entry.has_value():
+                continue  # Older than the max staleness; wait for a fresh fetch
+            cache[section] = value
+            generation, modified = bump_generation(section)
+            render_page(f'widget:{section}', f'widgets/{section}.html', generation, modified)
+            logger.info(f"Loaded {section} from snapshot taken {entry.describe()['age_text']}")
+        render_index_page()
+
+    shared_seen = {'generation': 0}
+
+    def sync_from_shared_store():
+        """Apply sections published by the leader since the last sync"""
+        try:
+            for section, generation, value, updated in shared_store.read_since(shared_seen['generation']):
+                shared_seen['generation'] = max(shared_seen['generation'], generation)
+                if section not in CACHE_SECTIONS:
+                    continue
+                if not (isinstance(value, dict) and {'value', 'fetched_at', 'last_error'} <= value.keys()):
+                    continue  # Row written by an older version
+                modified = datetime.fromtimestamp(updated, timezone.utc)
+                cache_entries[section].restore(value['value'], value['fetched_at'], value['last_error'])
+                cache[section] = value['value']
+                board_calendars.update(value.get('board_calendars') or {})
+                with generation_lock:
+                    cache_generation['sections'][section] = {'value': generation, 'modified': modified}
+                    if generation > cache_generation['value']:
+                        cache_generation['value'] = generation
+                        cache_generation['modified'] = modified
+                refresh_section(section, generation, modified)
+        except Exception as e:
+            logger.error(f"Error syncing from shared store: {str(e)}")
+
+    def page_validators(name):
+        page = page_cache.get(name)
+        if page is None:
+            return None, None
+        return cache_etag(page.version), page.modified
+
+    def location_slug():
+        """The ?location= requested, or None for the default location"""
+        slug = request.args.get('location')
+        return slug if slug and slug != weather_locations[0]['slug'] else None
+
+    def known_location(slug):
+        return any(location['slug'] == slug for location in weather_locations)
+
+    def weather_for(slug):
+        """Weather to render for a location; the section value itself is the default location"""
+        value = cache['weather']
+        if slug and isinstance(value, dict) and 'locations' in value:
+            return value['locations'].get(slug, {'error': True})
+        return value
+
+    def lazy_page(page_name, template, **view):
+        """Render a page variant on its first request after each cache change"""
+        generation, modified = current_generation()
+        page = page_cache.get(page_name)
+        if page is None or page.version != generation:
+            render_page(page_name, template, generation, modified, **view)
+        return page_name
+
+    def location_page(name, template, slug):
+        return lazy_page(f'{name}@{slug}', template, location=slug)
+
+    def board_view(board):
+        """A board's slice of the shared cache: the same entries, filtered to its profile"""
+        stocks = cache['stocks']
+        if board['categories'] and isinstance(stocks, dict) and 'data' in stocks:
+            stocks = {'categories': board['categories'], 'data': stocks['data']}
+        news = cache['news']
+        if board['news_feeds'] and isinstance(news, dict) and 'feeds' in news:
+            news = {'sections': news_pipeline.build_sections(news['feeds'], board['news_feeds'])}
+        calendar = cache['calendar']
+        if board['calendar_id'] != 'primary':
+            calendar = board_calendars.get(board['calendar_id'], {'loading': True})
+        return {'weather': weather_for(board['location']), 'stocks': stocks, 'news': news, 'calendar': calendar}
+
+    def board_page(name, section=None):
+        """Page name of a board (or one of its widgets), rendered if out of date"""
+        if section is None:
+            return lazy_page(f'board:{name}', 'index.html', board=boards[name])
+        return lazy_page(f'board:{name}:{section}', f'widgets/{section}.html', board=boards[name])
+
+    def index_validators():
+        slug = location_slug()
+        if slug is None:
+            return page_validators('index')
+        if not known_location(slug):
+            return None, None
+        return page_validators(location_page('index', 'index.html', slug))
+
+    def render_page(name, template, generation=None, modified=None, location=None, board=None):
+        """Render a template once and store it pre-compressed in the page cache"""
+        try:
+            if generation is None:
+                generation, modified = current_generation()
+            if board is not None:
+                view = board_view(board)
+            else:
+                view = {'weather': weather_for(location), 'stocks': cache['stocks'],
+                        'news': cache['news'], 'calendar': cache['calendar']}
+            # A bare request context lets url_for() build relative static URLs off-request
+            with app.test_request_context('/'):
+                html = render_template(template,
+                                    time=datetime.now(),
+                                    weather=view['weather'],
+                                    location=location,
+                                    board=board,
+                                    widget_base=f"/board/{board['name']}/widgets" if board else None,
+                                    calendar=view['calendar'],
+                                    stocks=view['stocks'],
+                                    news=view['news'],
+                                    last_update=cache['last_update'],
+                                    generations=section_generations(),
+                                    freshness=section_freshness(),
+                                    event_id=cache_etag(generation))
+            page_cache.store(name, html, version=generation, modified=modified)
+        except Exception as e:
+            logger.error(f"Error rendering {template}: {str(e)}", exc_info=True)
+
+    def render_index_page(generation=None, modified=None):
+        """Render the dashboard once and store it pre-compressed in the page cache"""
+        render_page('index', 'index.html', generation, modified)
+
+    def serve_rendered(name, template):
+        """Serve a pre-rendered page in the best encoding the client accepts"""
+        page = page_cache.get(name)
+        if page is None:
+            # Nothing published yet; render on demand this once
+            render_page(name, template)
+            page = page_cache.get(name)
+        if page is None:
+            return "Dashboard is not available yet", 503
+
+        encoding, body = page.select(request.headers.get('Accept-Encoding'))
+        response = make_response(body)
+        response.headers['Content-Type'] = 'text/html; charset=utf-8'
+        if encoding != 'identity':
+            # Already compressed, so Flask-Compress leaves it alone
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        return response
+
+    # Weather for every office (WEATHER_LOCATIONS, ';'-separated; the first is the default)
+    weather_locations = parse_locations(';'.join([os.getenv('WEATHER_LOCATIONS') or city] +
+                                                 [board['city'] for board in boards.values() if board['city']]))
+    weather_base_url = os.getenv('WEATHER_BASE_URL', 'http://api.openweathermap.org')
+    weather_service = WeatherService(
+        weather_client, weather_api_key, weather_locations,
+        Geocoder(weather_client, weather_api_key, base_url=weather_base_url,
+                 path=os.path.join(cache_snapshot.directory, 'geocode.json') if cache_snapshot else None),
+        base_url=weather_base_url,
+        max_workers=int(os.getenv('WEATHER_MAX_WORKERS', '8'))
+    )
+
+    @timed('provider_fetch_duration_seconds', 'Time to fetch and normalize one provider', provider='weather')
     def get_weather_data():
-        """Get weather data from OpenWeatherMap API"""
+        """Get weather data from OpenWeatherMap API for every configured location"""
         try:
             if not weather_api_key:
                 logger.error("Weather API key not found in .env file")
                 return None
 
-            logger.info(f"Updating weather data for {city}")
-            weather_url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={weather_api_key}&units=metric"
-            weather_response = requests.get(weather_url)
-            logger.info(f"Weather API response status: {weather_response.status_code}")
-            
-            if weather_response.status_code == 200:
-                weather_data = weather_response.json()
-                temp_c = round(weather_data['main']['temp'])
-                temp_f = round((temp_c * 9/5) + 32)
-                return {
-                    'city': weather_data['name'],
-                    'temperature_c': temp_c,
-                    'temperature_f': temp_f,
-                    'description': weather_data['weather'][0]['description'],
-                    'humidity': weather_data['main']['humidity'],
-                    'wind_speed': weather_data['wind']['speed']
-                }
-            else:
-                logger.error(f"Weather API error: {weather_response.status_code}")
-                logger.error(f"Response content: {weather_response.text}")
+            logger.info(f"Updating weather data for {len(weather_locations)} locations")
+            result = weather_service.refresh()
+            if result is None:
                 return None
+            # The section value is the default location's reading, plus every location by slug
+            default = result['locations'].get(result['default'])
+            if default is None:
+                # Not a successful refresh: keep the last good value and back off
+                logger.error(f"No weather reading for the default location {result['default']}")
+                return None
+            return dict(default, locations=result['locations'], default=result['default'])
         except Exception as e:
             logger.error(f"Error fetching weather data: {str(e)}")
             return None
 
-    def update_weather():
+    @timed('scheduler_job_duration_seconds', 'Duration of scheduled refresh jobs', job='weather')
+    def update_weather(force=False):
         """Update weather data"""
+        if not refresh_due('weather', force):
+            return False
         try:
             logger.info("Starting weather update...")
             logger.info(f"Current cache state before update: {cache['weather']}")
@@ -119,120 +527,211 @@ try:
             logger.info(f"Received weather data: {weather_data}")
             
             if weather_data:
-                cache['weather'] = weather_data
+                record_refresh('weather', weather_data)
                 logger.info(f"Weather data updated successfully. New cache state: {cache['weather']}")
             else:
-                cache['weather'] = {'error': True}
+                record_refresh('weather', error='Weather API returned no data')
                 logger.error("Weather data update failed - got None response")
             cache['last_update'] = datetime.now()
         except Exception as e:
             logger.error(f"Error updating weather: {str(e)}")
-            cache['weather'] = {'error': True}
+            record_refresh('weather', error=str(e))
+        publish_cache_update('weather')
+        raise_if_failed('weather')
+
+    def build_stock_index(categories):
+        """Flatten categories into a deduplicated symbol list and a symbol->category index.
+
+        A symbol listed under several categories is fetched once and reported
+        under the first category it appears in.
+        """
+        symbols = []
+        symbol_categories = {}
+        for category, stocks in categories.items():
+            for symbol in stocks:
+                if symbol not in symbol_categories:
+                    symbol_categories[symbol] = category
+                    symbols.append(symbol)
+        return categories, symbols, symbol_categories
 
     def load_stock_config():
         """Load stock configuration from Azure App Configuration"""
         try:
             config = config_manager.get_stock_config()
-            # Flatten the dictionary of categories into a list of symbols
-            symbols = []
-            for category, stocks in config['stocks'].items():
-                symbols.extend(stocks)
-            return config['stocks'], symbols
+            return build_stock_index(config['stocks'])
         except Exception as e:
             logger.error(f"Error loading stock configuration: {str(e)}")
-            return {}, []
+            return {}, [], {}
+
+    def reload_stock_config():
+        """Reload the watchlist and swap in the rebuilt index with a single assignment"""
+        global stock_watchlist
+        stock_watchlist = load_stock_config()
+        logger.info(f"Stock watchlist loaded with {len(stock_watchlist[1])} symbols")
+        return stock_watchlist
+
+    # Load stock configuration: (categories, symbols, symbol_categories)
+    stock_watchlist = load_stock_config()
+
+    def check_stock_config():
+        """Poll App Configuration and hot-swap the watchlist when the setting changes"""
+        try:
+            if config_manager.refresh_stock_config():
+                logger.info("Stock configuration changed, reloading watchlist")
+                reload_stock_config()
+                refresh_jobs.run('stocks')
+        except Exception as e:
+            logger.error(f"Error checking stock configuration: {str(e)}")
+
+    # Finnhub quota: free tier allows 60 calls/minute. The client takes a slot for
+    # every attempt (retries and health probes too), so no 60-second span exceeds it.
+    finnhub_limiter = SlidingWindowLimiter(calls_per_minute=int(os.getenv('FINNHUB_CALLS_PER_MINUTE', '60')))
+    finnhub_max_workers = int(os.getenv('FINNHUB_MAX_WORKERS', '8'))
+    finnhub_client = get_client('finnhub', pool_maxsize=finnhub_max_workers,
+                                breaker=get_breaker('finnhub', **breaker_settings),
+                                limiter=finnhub_limiter)
+
+    def create_quote_provider():
+        """Quote backend from QUOTE_PROVIDER: 'finnhub' (per-symbol) or 'batch'"""
+        provider = os.getenv('QUOTE_PROVIDER', 'finnhub').lower()
+        if provider == 'batch':
+            batch_url = os.getenv('QUOTE_BATCH_URL', 'https://financialmodelingprep.com/api/v3/quote')
+            batch_client = get_client('quotes', breaker=get_breaker('quotes', **breaker_settings))
+            return BatchQuoteProvider(
+                batch_client, batch_url,
+                api_key=os.getenv('QUOTE_API_KEY'),
+                batch_size=int(os.getenv('QUOTE_BATCH_SIZE', '100')),
+                limiter=TokenBucket(rate_per_minute=int(os.getenv('QUOTE_CALLS_PER_MINUTE', '300')))
+            )
+        if provider != 'finnhub':
+            logger.error(f"Unknown QUOTE_PROVIDER '{provider}', falling back to finnhub")
+        if not finnhub_api_key:
+            return None
+        return FinnhubQuoteProvider(
+            finnhub_client, finnhub_api_key,
+            base_url=os.getenv('FINNHUB_BASE_URL', 'https://finnhub.io/api/v1'),
+            max_workers=finnhub_max_workers
+        )
 
-    # Load stock configuration
-    STOCK_CATEGORIES, STOCK_SYMBOLS = load_stock_config()
+    quote_provider = create_quote_provider()
+    board_symbols = union_symbols(boards)
 
+    @timed('provider_fetch_duration_seconds', 'Time to fetch and normalize one provider', provider='stocks')
     def get_stock_data():
-        """Get real-time stock data from Finnhub API"""
+        """Get real-time stock data from the configured quote provider"""
         try:
             logger.info("Updating stock data...")
-            stock_data = {}
-            
-            if not finnhub_api_key:
+
+            if quote_provider is None:
                 logger.error("Finnhub API key not found in .env file")
                 return None
 
-            headers = {
-                'X-Finnhub-Token': finnhub_api_key
-            }
+            if quote_provider.client.breaker.is_open():
+                logger.warning(f"{quote_provider.name} circuit is open, skipping stock update")
+                return None
+
+            # Read the watchlist once so a concurrent reload can't mix two configs
+            categories, symbols, symbol_categories = stock_watchlist
+            # Board symbols ride along in the same fetch; each symbol is requested once
+            symbols = symbols + [symbol for symbol in board_symbols if symbol not in symbol_categories]
+
+            quotes = quote_provider.get_quotes(symbols)
+            fetched = sum(1 for symbol in symbols if quotes.get(symbol))
+            logger.info(f"Fetched {fetched}/{len(symbols)} quotes via {quote_provider.name}")
+            if symbols and fetched < len(symbols) / 2:
+                # Mostly failed (a half-open circuit lets one trial call through, or it
+                # opened mid-run): count it as a failure and keep the last good data
+                return None
 
-            for symbol in STOCK_SYMBOLS:
-                try:
-                    logger.info(f"Fetching data for {symbol}")
-                    
-                    # Get real-time quote data
-                    url = f"https://finnhub.io/api/v1/quote?symbol={symbol}"
-                    response = requests.get(url, headers=headers)
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        logger.info(f"Raw API response for {symbol}: {data}")
-                        
-                        if data.get('c') is not None:  # Current price
-                            current_price = data['c']
-                            previous_close = data['pc']
-                            
-                            # Calculate percentage change
-                            if previous_close > 0:
-                                change_percent = ((current_price - previous_close) / previous_close) * 100
-                            else:
-                                change_percent = 0
-                            
-                            # Find the category for this symbol
-                            category = next((cat for cat, symbols in STOCK_CATEGORIES.items() 
-                                          if symbol in symbols), "Other")
-                            
-                            stock_data[symbol] = {
-                                'price': round(current_price, 2),
-                                'change': round(change_percent, 2),
-                                'category': category
-                            }
-                            logger.info(f"Successfully fetched {symbol}: ${current_price} ({change_percent}%)")
-                        else:
-                            logger.error(f"No quote data found for {symbol}")
-                            stock_data[symbol] = {'price': 'N/A', 'change': 'N/A', 'category': 'Other'}
-                    else:
-                        logger.error(f"Error fetching {symbol}: HTTP {response.status_code}")
-                        stock_data[symbol] = {'price': 'N/A', 'change': 'N/A', 'category': 'Other'}
-                    
-                except Exception as e:
-                    logger.error(f"Error fetching {symbol}: {str(e)}")
+            # Symbols that failed this time keep their last good quote, marked stale
+            previous = cache_entries['stocks'].value
+            previous_data = previous.get('data', {}) if isinstance(previous, dict) else {}
+            stock_data = {}
+            for symbol in symbols:
+                quote = quotes.get(symbol)
+                last_good = previous_data.get(symbol) or {}
+                if quote:
+                    stock_data[symbol] = dict(quote, category=symbol_categories.get(symbol, 'Other'))
+                elif last_good.get('price', 'N/A') != 'N/A':
+                    stock_data[symbol] = dict(last_good, category=symbol_categories.get(symbol, 'Other'), stale=True)
+                else:
                     stock_data[symbol] = {'price': 'N/A', 'change': 'N/A', 'category': 'Other'}
-                
-                # Add a small delay between requests
-                time.sleep(0.5)
-            
-            return {'categories': STOCK_CATEGORIES, 'data': stock_data}
+
+            return {'categories': categories, 'data': stock_data}
         except Exception as e:
             logger.error(f"Error in get_stock_data: {str(e)}")
             return None
 
-    def update_stocks():
+    @timed('scheduler_job_duration_seconds', 'Duration of scheduled refresh jobs', job='stocks')
+    def update_stocks(force=False):
         """Update stock data"""
+        if not refresh_due('stocks', force):
+            return False
         try:
             stock_data = get_stock_data()
             if stock_data:
-                cache['stocks'] = stock_data
+                record_refresh('stocks', stock_data)
                 logger.info("Stock data updated successfully")
             else:
-                cache['stocks'] = {'error': True}
+                record_refresh('stocks', error='Stock API returned no data')
         except Exception as e:
             logger.error(f"Error updating stocks: {str(e)}")
-            cache['stocks'] = {'error': True}
+            record_refresh('stocks', error=str(e))
+        publish_cache_update('stocks')
+        raise_if_failed('stocks')
+
+    # Incremental syncToken-based calendar sync (set CALENDAR_INCREMENTAL_SYNC=false for daily full lists)
+    calendar_incremental = os.getenv('CALENDAR_INCREMENTAL_SYNC', 'true').lower() == 'true'
+    calendar_sync = CalendarSync(calendar_client) if calendar_incremental else None
+    calendar_refresh_minutes = int(os.getenv('CALENDAR_REFRESH_MINUTES', '1' if calendar_incremental else '15'))
 
+    calendar_breaker = get_breaker('google_calendar', **breaker_settings)
+
+    # Calendars only boards use: one incremental sync per distinct calendar id
+    board_calendar_syncs = {
+        calendar_id: CalendarSync(calendar_client, calendar_id=calendar_id)
+        for calendar_id in sorted({board['calendar_id'] for board in boards.values()})
+        if calendar_id != 'primary'
+    }
+    board_calendars = {}  # calendar id -> last good events
+    # Long-lived so each thread keeps its built Calendar service between syncs
+    board_calendar_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='board-calendar')
+
+    def sync_board_calendars():
+        """Refresh the board-only calendars concurrently"""
+        if not board_calendar_syncs or calendar_breaker.is_open():
+            return
+        results = fetch_concurrently(lambda calendar_id: board_calendar_syncs[calendar_id].sync(),
+                                     list(board_calendar_syncs), executor=board_calendar_executor)
+        for calendar_id, events in results.items():
+            if events is not None:
+                board_calendars[calendar_id] = events
+
+    @timed('provider_fetch_duration_seconds', 'Time to fetch and normalize one provider', provider='calendar')
     def get_calendar_events():
-        """Get today's calendar events"""
+        """Get today's calendar events through the calendar circuit breaker"""
+        if not calendar_breaker.allow_request():
+            logger.warning("Google Calendar circuit is open, skipping calendar update")
+            return None
+        start_time = time.time()
+        events = fetch_calendar_events()
+        if events is None:
+            calendar_breaker.record_failure()
+        else:
+            calendar_breaker.record_success(time.time() - start_time)
+        return events
+
+    def fetch_calendar_events():
+        """Fetch today's calendar events from Google Calendar"""
         try:
-            creds = get_calendar_credentials()
-            if not creds:
+            if calendar_sync is not None:
+                return calendar_sync.sync()
+
+            service = calendar_client.get_service()
+            if not service:
                 logger.error("Failed to get calendar credentials")
                 return None
 
-            service = build('calendar', 'v3', credentials=creds)
-
             # Get the start and end of today in EST
             est = pytz.timezone('America/New_York')
             now = datetime.now(est)
@@ -264,26 +763,9 @@ try:
 
             formatted_events = []
             for event in events:
-                start = event['start'].get('dateTime', event['start'].get('date'))
-                end = event['end'].get('dateTime', event['end'].get('date'))
-                
-                # Convert to datetime object in EST
-                if 'T' in start:  # This is a datetime
-                    start_time = datetime.fromisoformat(start.replace('Z', '+00:00'))
-                    # Convert to EST
-                    start_time = start_time.astimezone(est)
-                    # Format time as HH:MM
-                    time_str = start_time.strftime('%H:%M')
-                else:  # This is a date
-                    time_str = 'All day'
-
-                formatted_events.append({
-                    'time': time_str,
-                    'summary': event['summary'],
-                    'start': start,
-                    'end': end
-                })
-                logger.info(f"Added event: {time_str} EST - {event['summary']}")
+                formatted = format_event(event, est)
+                formatted_events.append(formatted)
+                logger.info(f"Added event: {formatted['time']} EST - {formatted['summary']}")
 
             logger.info(f"Found {len(formatted_events)} events for today")
             return formatted_events
@@ -293,108 +775,326 @@ try:
             logger.exception("Full error details:")
             return None
 
-    def update_calendar():
+    # What the pages last showed for the calendar, so a sync that found no changes
+    # doesn't bump the generation (and with it every ETag, page render and SSE client)
+    calendar_published = {'events': None, 'boards': None, 'at': 0}
+
+    def calendar_unchanged(events):
+        """True when the pages already show these events and their "as of" label is still fresh"""
+        entry = cache_entries['calendar']
+        return (entry.last_error is None and events == calendar_published['events']
+                and board_calendars == calendar_published['boards']
+                # Republish now and then so the rendered "as of" label doesn't go stale
+                and time.time() - calendar_published['at'] < entry.ttl / 2)
+
+    @timed('scheduler_job_duration_seconds', 'Duration of scheduled refresh jobs', job='calendar')
+    def update_calendar(force=False):
         """Update calendar data"""
+        if not refresh_due('calendar', force):
+            return False
         try:
-            # Set loading state
-            cache['calendar'] = {'loading': True}
-            
+            # Keep showing the last good events while this refresh runs
             events = get_calendar_events()
+            sync_board_calendars()
             if events is not None:
                 if isinstance(events, list):
-                    cache['calendar'] = events
+                    if calendar_unchanged(events):
+                        cache_entries['calendar'].record_success(events)
+                        logger.info("Calendar unchanged, keeping the current generation")
+                        return
+                    record_refresh('calendar', events)
                     logger.info(f"Calendar data updated successfully with {len(events)} events")
                 else:
                     logger.error("Calendar events returned invalid format")
-                    cache['calendar'] = {'error': True, 'message': 'Invalid calendar data format'}
+                    record_refresh('calendar', error='Invalid calendar data format')
             else:
                 logger.error("Failed to fetch calendar events")
-                cache['calendar'] = {'error': True, 'message': 'Unable to fetch calendar events'}
+                record_refresh('calendar', error='Unable to fetch calendar events')
         except Exception as e:
             logger.error(f"Error updating calendar: {str(e)}")
-            cache['calendar'] = {'error': True, 'message': str(e)}
+            record_refresh('calendar', error=str(e))
+        publish_cache_update('calendar')
+        calendar_published.update(events=cache['calendar'] if section_ok('calendar') else None,
+                                  boards=dict(board_calendars), at=time.time())
+        raise_if_failed('calendar')
 
+    # News feeds (NEWS_FEEDS) are fetched concurrently under one shared limiter
+    news_feeds = parse_news_feeds(os.getenv('NEWS_FEEDS', DEFAULT_NEWS_FEEDS))
+    all_news_feeds = union_feeds(news_feeds, boards)  # board feeds share the same fetch
+    news_pipeline = NewsPipeline(
+        news_client, news_api_key, all_news_feeds,
+        base_url=os.getenv('NEWS_BASE_URL', 'https://newsapi.org/v2'),
+        articles_per_feed=int(os.getenv('NEWS_ARTICLES_PER_FEED', '5')),
+        limiter=TokenBucket(rate_per_minute=int(os.getenv('NEWS_CALLS_PER_MINUTE', '30')),
+                            burst=max(1, len(all_news_feeds))),
+        max_workers=int(os.getenv('NEWS_MAX_WORKERS', '4'))
+    )
+
+    @timed('provider_fetch_duration_seconds', 'Time to fetch and normalize one provider', provider='news')
     def get_news_data():
         """Get news data from NewsAPI"""
         try:
-            logger.info("Fetching news data...")
-            news_data = {
-                'business': [],
-                'politics': []
-            }
-
-            # Fetch business news
-            business_url = f"https://newsapi.org/v2/top-headlines?country=us&category=business&apiKey={news_api_key}"
-            business_response = requests.get(business_url)
-            
-            # Fetch political news
-            politics_url = f"https://newsapi.org/v2/top-headlines?country=us&category=politics&apiKey={news_api_key}"
-            politics_response = requests.get(politics_url)
-            
-            if business_response.status_code == 200:
-                data = business_response.json()
-                if data.get('status') == 'ok':
-                    # Get the first 5 articles
-                    articles = data.get('articles', [])[:5]
-                    for article in articles:
-                        news_data['business'].append({
-                            'title': article.get('title', ''),
-                            'description': article.get('description', ''),
-                            'url': article.get('url', ''),
-                            'source': article.get('source', {}).get('name', ''),
-                            'published_at': datetime.strptime(article.get('publishedAt', ''), '%Y-%m-%dT%H:%M:%SZ').strftime('%H:%M %d/%m') if article.get('publishedAt') else ''
-                        })
-                    logger.info(f"Successfully fetched {len(news_data['business'])} business news articles")
-            else:
-                logger.error(f"Business News API HTTP error: {business_response.status_code}")
-
-            # Add a small delay between requests to avoid rate limiting
-            time.sleep(1)
-
-            if politics_response.status_code == 200:
-                data = politics_response.json()
-                if data.get('status') == 'ok':
-                    # Get the first 5 articles
-                    articles = data.get('articles', [])[:5]
-                    for article in articles:
-                        news_data['politics'].append({
-                            'title': article.get('title', ''),
-                            'description': article.get('description', ''),
-                            'url': article.get('url', ''),
-                            'source': article.get('source', {}).get('name', ''),
-                            'published_at': datetime.strptime(article.get('publishedAt', ''), '%Y-%m-%dT%H:%M:%SZ').strftime('%H:%M %d/%m') if article.get('publishedAt') else ''
-                        })
-                    logger.info(f"Successfully fetched {len(news_data['politics'])} political news articles")
-                else:
-                    logger.error(f"Politics News API HTTP error: {politics_response.status_code}")
-
-            return news_data if (news_data['business'] or news_data['politics']) else None
-            
+            logger.info(f"Fetching news data for {len(news_feeds)} feeds...")
+            return news_pipeline.collect(news_feeds)
         except Exception as e:
             logger.error(f"Error fetching news data: {str(e)}")
             return None
 
-    def update_news():
+    @timed('scheduler_job_duration_seconds', 'Duration of scheduled refresh jobs', job='news')
+    def update_news(force=False):
         """Update news data"""
+        if not refresh_due('news', force):
+            return False
         try:
             news_data = get_news_data()
             if news_data:
-                cache['news'] = news_data
+                record_refresh('news', news_data)
                 logger.info("News data updated successfully")
             else:
-                cache['news'] = {'error': True}
+                record_refresh('news', error='News API returned no data')
         except Exception as e:
             logger.error(f"Error updating news: {str(e)}")
-            cache['news'] = {'error': True}
+            record_refresh('news', error=str(e))
+        publish_cache_update('news')
+        raise_if_failed('news')
 
+    def submit_refresh(func, name):
+        """Run a triggered refresh on the scheduler's thread pool"""
+        if scheduler and scheduler.running:
+            scheduler.add_job(func=func, name=name, misfire_grace_time=None)
+        else:
+            threading.Thread(target=func, name=name, daemon=True).start()
+
+    # Every refresh goes through here so a provider is never fetched twice at once
+    refresh_jobs = RefreshJobs({
+        'weather': update_weather,
+        'calendar': update_calendar,
+        'stocks': update_stocks,
+        'news': update_news
+    }, submit_refresh, min_interval=int(os.getenv('TRIGGER_MIN_INTERVAL_SECONDS', '60')))
+
+    # Explicit refreshes always run on the leader: a follower that fetched itself
+    # would publish generations the leader's rows can collide with
+    remote_jobs = set()  # ids of follower requests the leader still reports on
+
+    def request_refresh(providers):
+        """Queue an explicit refresh and return its job id; followers hand it to the leader"""
+        if shared_store is not None and not is_leader():
+            job_id = uuid.uuid4().hex
+            shared_store.enqueue_request(job_id, providers)
+            return job_id
+        # An explicit refresh fetches even while a section is backing off
+        return refresh_jobs.trigger(providers, force=True)
+
+    def process_refresh_requests():
+        """Leader job: run the refreshes followers queued and publish their progress"""
+        try:
+            for job_id, providers in shared_store.claim_requests():
+                refresh_jobs.trigger(providers, force=True, job_id=job_id)
+                remote_jobs.add(job_id)
+            for job_id in list(remote_jobs):
+                job = refresh_jobs.status(job_id)
+                if job is not None:
+                    shared_store.update_request(job_id, job)
+                if job is None or job['status'] not in ('queued', 'running'):
+                    remote_jobs.discard(job_id)
+        except Exception as e:
+            logger.error(f"Error processing queued refresh requests: {str(e)}")
+
+    def refresh_job_status(job_id):
+        """A job's progress, from this worker or as the leader last published it"""
+        job = refresh_jobs.status(job_id)
+        if job is not None or shared_store is None or is_leader():
+            return job
+        queued = shared_store.get_request(job_id)
+        if queued is None:
+            return None
+        if queued['status']:
+            return queued['status']
+        created = datetime.fromtimestamp(queued['created'], timezone.utc).isoformat()
+        return {
+            'job_id': job_id,
+            'status': 'queued',
+            'created_at': created,
+            'providers': {
+                provider: {'state': 'queued', 'error': None, 'queued_at': created,
+                           'started_at': None, 'finished_at': None}
+                for provider in queued['providers']
+            }
+        }
+
+    # Long-lived for the same reason: the calendar refresh reuses its thread's service
+    update_executor = ThreadPoolExecutor(max_workers=len(CACHE_SECTIONS), thread_name_prefix='update')
+
+    @timed('scheduler_job_duration_seconds', 'Duration of scheduled refresh jobs', job='all')
     def update_all():
-        """Initial update of all data"""
-        logger.info("Starting initial data update...")
-        update_weather()
-        update_calendar()
-        update_stocks()
-        update_news()
-        logger.info("Initial data update completed")
+        """Update all data, running the providers concurrently"""
+        logger.info("Starting data update...")
+        start_time = time.time()
+        fetch_concurrently(refresh_jobs.run, list(CACHE_SECTIONS), executor=update_executor)
+        logger.info(f"Data update completed in {time.time() - start_time:.2f} seconds")
+
+    # Provider health probes run on the leader's scheduler and are shared through the
+    # store, so upstream probe traffic doesn't grow with the worker count;
+    # /health/full only reads the stored results
+    health_probe_seconds = int(os.getenv('HEALTH_PROBE_SECONDS', '300'))
+    health_probes_lock = threading.Lock()
+    health_probes = {'services': {}, 'checked_at': None, 'duration_seconds': None}
+
+    def probe_weather():
+        """Check the OpenWeatherMap API"""
+        try:
+            if weather_api_key:
+                weather_url = f"{weather_base_url}/data/2.5/weather?q={weather_locations[0]['name']}&appid={weather_api_key}&units=metric"
+                response = weather_client.get(weather_url, timeout=10)
+                return {
+                    'status': 'healthy' if response.status_code == 200 else 'error',
+                    'code': response.status_code,
+                    'response': response.json() if response.status_code == 200 else response.text
+                }
+            return {'status': 'error', 'reason': 'no API key'}
+        except Exception as e:
+            logger.error(f"Health check - Weather API error: {str(e)}")
+            return {'status': 'error', 'error': str(e)}
+
+    def probe_finnhub():
+        """Check the stock quote provider"""
+        try:
+            if quote_provider is not None:
+                return quote_provider.probe()
+            return {'status': 'error', 'reason': 'no API key'}
+        except Exception as e:
+            logger.error(f"Health check - Finnhub API error: {str(e)}")
+            return {'status': 'error', 'error': str(e)}
+
+    def probe_google_calendar():
+        """Check Google Calendar by listing calendars"""
+        try:
+            if calendar_breaker.is_open():
+                return {'status': 'error', 'reason': 'circuit open'}
+            service = calendar_client.get_service()
+            if service:
+                calendar_list = service.calendarList().list().execute()
+                return {
+                    'status': 'healthy',
+                    'calendars_found': len(calendar_list.get('items', []))
+                }
+            return {'status': 'error', 'reason': 'no credentials'}
+        except Exception as e:
+            logger.error(f"Health check - Google Calendar error: {str(e)}")
+            return {'status': 'error', 'error': str(e)}
+
+    def probe_azure_config():
+        """Check Azure App Configuration (cached; refreshed by the config poll job)"""
+        try:
+            config = config_manager.get_stock_config()
+            if config and 'stocks' in config:
+                return {
+                    'status': 'healthy',
+                    'config_found': True,
+                    'stocks_configured': len(config['stocks']),
+                    'symbols_watched': len(stock_watchlist[1]),
+                    'refresh': config_manager.status()
+                }
+            return {'status': 'error', 'reason': 'no configuration'}
+        except Exception as e:
+            logger.error(f"Health check - Azure Config error: {str(e)}")
+            return {'status': 'error', 'error': str(e)}
+
+    health_checks = {
+        'weather_api': probe_weather,
+        'finnhub_api': probe_finnhub,
+        'google_calendar': probe_google_calendar,
+        'azure_config': probe_azure_config
+    }
+    probe_executor = ThreadPoolExecutor(max_workers=len(health_checks), thread_name_prefix='health-probe')
+
+    def run_health_probes():
+        """Probe every provider in parallel and store the results (leader only)"""
+        start_time = time.time()
+        results = fetch_concurrently(lambda name: health_checks[name](), list(health_checks),
+                                     executor=probe_executor)
+        with health_probes_lock:
+            health_probes['services'] = {
+                name: results.get(name) or {'status': 'error', 'error': 'probe failed'}
+                for name in health_checks
+            }
+            health_probes['checked_at'] = time.time()
+            health_probes['duration_seconds'] = round(time.time() - start_time, 3)
+            probes = dict(health_probes)
+        if shared_store is not None:
+            try:
+                shared_store.put('health_probes', probes)
+            except Exception as e:
+                logger.error(f"Error publishing health probes to shared store: {str(e)}")
+
+    def latest_health_probes():
+        """This worker's probe results, or the leader's from the shared store on a follower"""
+        if shared_store is not None and not is_leader():
+            try:
+                probes = shared_store.get('health_probes')
+                if probes:
+                    return probes
+            except Exception as e:
+                logger.error(f"Error reading health probes from shared store: {str(e)}")
+        with health_probes_lock:
+            return dict(health_probes)
+
+    def start_warmup():
+        """Run the initial data load in the background so the app can serve immediately"""
+        threading.Thread(target=update_all, name='warmup', daemon=True).start()
+
+    def add_provider_jobs():
+        """Schedule the upstream refresh jobs; only the leader runs these"""
+        # Only add jobs if their API keys are present
+        if weather_api_key:
+            scheduler.add_job(func=refresh_jobs.run, args=['weather'], name='update_weather',
+                              trigger="interval", minutes=5)
+        else:
+            logger.warning("Weather API key missing - weather updates disabled")
+
+        scheduler.add_job(func=refresh_jobs.run, args=['calendar'], name='update_calendar',
+                          trigger="interval", minutes=calendar_refresh_minutes)
+
+        if quote_provider is not None:
+            scheduler.add_job(func=refresh_jobs.run, args=['stocks'], name='update_stocks',
+                              trigger="interval", seconds=stocks_refresh_seconds)
+            scheduler.add_job(func=check_stock_config, trigger="interval",
+                              seconds=config_manager.refresh_interval)
+        else:
+            logger.warning("Finnhub API key missing - stock updates disabled")
+
+        if news_api_key:
+            scheduler.add_job(func=refresh_jobs.run, args=['news'], name='update_news',
+                              trigger="interval", minutes=30)
+        else:
+            logger.warning("News API key missing - news updates disabled")
+
+    def become_leader():
+        """Take over the provider jobs, continuing from the shared store's state"""
+        if shared_store is not None:
+            sync_from_shared_store()
+            with generation_lock:
+                cache_generation['value'] = max(cache_generation['value'], shared_store.max_generation())
+            for job_id in ('shared_sync', 'leader_takeover'):
+                if scheduler.get_job(job_id):
+                    scheduler.remove_job(job_id)
+        add_provider_jobs()
+        if shared_store is not None:
+            scheduler.add_job(func=process_refresh_requests, trigger="interval", seconds=shared_sync_seconds,
+                              id='refresh_requests', replace_existing=True)
+        scheduler.add_job(func=run_health_probes, trigger="interval", seconds=health_probe_seconds,
+                          id='health_probes', next_run_time=datetime.now(), replace_existing=True)
+
+        # Warm the cache in the background; widgets show placeholders until then
+        logger.info("Starting initial data load in the background...")
+        start_warmup()
+
+    def try_take_leadership():
+        """Follower job: become leader if the previous leader has gone away"""
+        if leader_lock.try_acquire():
+            logger.info("Took over scheduler leadership")
+            become_leader()
 
     def init_scheduler():
         """Initialize the background scheduler"""
@@ -403,43 +1103,33 @@ try:
             try:
                 logger.info("Initializing background scheduler...")
                 scheduler = BackgroundScheduler()
-                
-                # Only add jobs if their API keys are present
-                if weather_api_key:
-                    scheduler.add_job(func=update_weather, trigger="interval", minutes=5)
-                else:
-                    logger.warning("Weather API key missing - weather updates disabled")
-                    
-                scheduler.add_job(func=update_calendar, trigger="interval", minutes=15)
-                
-                if finnhub_api_key:
-                    scheduler.add_job(func=update_stocks, trigger="interval", hours=1)
-                else:
-                    logger.warning("Finnhub API key missing - stock updates disabled")
-                
-                if news_api_key:
-                    scheduler.add_job(func=update_news, trigger="interval", minutes=30)
+
+                if leader_lock is None or leader_lock.try_acquire():
+                    become_leader()
                 else:
-                    logger.warning("News API key missing - news updates disabled")
-                
+                    # Another worker runs the provider jobs; follow its published state
+                    logger.info("Another process holds the scheduler lock, following the shared store")
+                    sync_from_shared_store()
+                    scheduler.add_job(func=sync_from_shared_store, trigger="interval",
+                                      seconds=shared_sync_seconds, id='shared_sync')
+                    scheduler.add_job(func=try_take_leadership, trigger="interval",
+                                      seconds=10, id='leader_takeover')
+
                 scheduler.start()
                 logger.info("Background scheduler started successfully")
-                
-                # Perform initial data load
-                logger.info("Starting initial data load...")
-                update_all()
-                logger.info("Initial data load completed")
                 return True
             except Exception as e:
                 logger.error(f"Failed to initialize scheduler: {str(e)}", exc_info=True)
                 return False
         return True
 
-    # Initialize scheduler when the app starts
+    # Show the last snapshot immediately, then initialize the scheduler to refresh it
+    load_cache_snapshot()
     if not init_scheduler():
         logger.error("Failed to initialize the application scheduler")
 
     @app.route('/status')
+    @performance_monitor
     def scheduler_status():
         """Endpoint to check scheduler status"""
         return jsonify({
@@ -450,27 +1140,202 @@ try:
                 'news': not isinstance(cache['news'], dict) or not cache['news'].get('loading', False),
                 'calendar': not isinstance(cache['calendar'], dict) or not cache['calendar'].get('loading', False)
             },
-            'last_update': str(cache['last_update']) if cache['last_update'] else None
+            'last_update': str(cache['last_update']) if cache['last_update'] else None,
+            'freshness': section_freshness(),
+            'http_clients': connection_stats(),
+            'http_cache': http_cache.stats(),
+            'event_stream': broadcaster.stats(),
+            'calendar_sync': calendar_sync.status() if calendar_sync else None,
+            'circuit_breakers': breaker_states(),
+            'refresh_jobs': refresh_jobs.stats(),
+            'boards': sorted(boards),
+            'scheduler_role': 'leader' if is_leader() else 'follower'
         })
 
-    @app.route('/trigger-update')
+    def section_validators(section):
+        generation, modified = current_generation(section)
+        return cache_etag(generation), modified
+
+    def snapshot_validators():
+        generation, modified = current_generation()
+        return cache_etag(generation), modified
+
+    def widget_validators(section):
+        slug = location_slug() if section == 'weather' else None
+        if slug is None:
+            return page_validators(f'widget:{section}')
+        if not known_location(slug):
+            return None, None
+        return page_validators(location_page('widget:weather', 'widgets/weather.html', slug))
+
+    @app.route('/api/<any(weather, stocks, calendar, news):section>')
+    @https_redirect
+    @rate_limit
+    @performance_monitor
+    @cache_control(max_age=0)  # Clients revalidate with If-None-Match
+    @conditional_get(section_validators)
+    def section_data(section):
+        """Read-only JSON view of one cache section"""
+        generation, modified = current_generation(section)
+        freshness = cache_entries[section].describe()
+        return jsonify({
+            'section': section,
+            'generation': generation,
+            'updated': modified.isoformat(),
+            'stale': freshness['stale'],
+            'fetched_at': freshness['fetched_at'],
+            'freshness': freshness,
+            'data': cache[section]
+        })
+
+    @app.route('/api/snapshot')
+    @https_redirect
+    @rate_limit
+    @performance_monitor
+    @cache_control(max_age=0)
+    @conditional_get(snapshot_validators)
+    def snapshot_data():
+        """Read-only JSON view of every cache section with its generation"""
+        generation, modified = current_generation()
+        generations = section_generations()
+        freshness = section_freshness()
+        return jsonify({
+            'generation': generation,
+            'updated': modified.isoformat(),
+            'sections': {
+                section: {'generation': generations[section], 'freshness': freshness[section], 'data': cache[section]}
+                for section in CACHE_SECTIONS
+            }
+        })
+
+    # Widget fragments skip the per-IP limiter like /events: every delta makes each
+    # kiosk refetch one, kiosks behind a NAT share an address, and the fragments are
+    # served pre-rendered from the page cache
+    @app.route('/widgets/<any(weather, stocks, calendar, news):section>')
+    @https_redirect
+    @performance_monitor
+    @cache_control(max_age=0)
+    @conditional_get(widget_validators)
+    def widget_fragment(section):
+        """Pre-rendered HTML for one widget, used by the page to patch itself"""
+        slug = location_slug() if section == 'weather' else None
+        if slug is None:
+            return serve_rendered(f'widget:{section}', f'widgets/{section}.html')
+        if not known_location(slug):
+            return "Unknown location", 404
+        return serve_rendered(location_page('widget:weather', 'widgets/weather.html', slug), 'widgets/weather.html')
+
+    def board_validators(name, section=None):
+        if name not in boards:
+            return None, None
+        return page_validators(board_page(name, section))
+
+    @app.route('/board/<name>')
+    @https_redirect
+    @rate_limit
+    @performance_monitor
+    @cache_control(max_age=300)
+    @conditional_get(board_validators)
+    def board_index(name):
+        """A named dashboard profile, rendered from the shared cache"""
+        if name not in boards:
+            return "Unknown board", 404
+        return serve_rendered(board_page(name), 'index.html')
+
+    @app.route('/board/<name>/widgets/<any(weather, stocks, calendar, news):section>')
+    @https_redirect
+    @performance_monitor
+    @cache_control(max_age=0)
+    @conditional_get(board_validators)
+    def board_widget(name, section):
+        """Pre-rendered HTML for one widget of a board"""
+        if name not in boards:
+            return "Unknown board", 404
+        return serve_rendered(board_page(name, section), f'widgets/{section}.html')
+
+    # Not behind the per-IP limiter: kiosks behind one NAT share an address, and
+    # the subscriber cap already bounds what streams can cost
+    @app.route('/events')
+    @https_redirect
+    def event_stream():
+        """Server-Sent Events stream of cache deltas"""
+        # On reconnect the browser sends Last-Event-ID; the first connect passes ?since=
+        since = parse_event_id(request.headers.get('Last-Event-ID') or request.args.get('since'))
+        subscriber = broadcaster.subscribe()
+        if subscriber is None:
+            return make_response('Too many event stream clients', 503)
+
+        # Catch the client up on anything newer than what it already has
+        for section, generation in section_generations().items():
+            if generation > since:
+                subscriber.offer(section, delta_event(section))
+
+        def stream():
+            try:
+                yield 'retry: 5000\n\n'
+                while True:
+                    messages = subscriber.next_messages(timeout=15)
+                    if not messages:
+                        yield ': keepalive\n\n'
+                    for message in messages:
+                        yield message
+            finally:
+                broadcaster.unsubscribe(subscriber)
+
+        response = Response(stream(), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+
+    # Explicit refreshes bypass the failure backoff, so they are rate limited per client
+    # and RefreshJobs skips providers triggered within TRIGGER_MIN_INTERVAL_SECONDS
+    @app.route('/trigger-update', methods=['GET', 'POST'])
+    @rate_limit
+    @performance_monitor
     def trigger_update():
-        """Endpoint to manually trigger data updates"""
+        """Queue a background refresh (?providers=stocks,news; default all) and return its job id"""
         try:
-            update_all()
-            return jsonify({'status': 'success', 'message': 'Data update triggered successfully'})
+            requested = request.args.get('providers') or request.args.get('provider')
+            providers = [p.strip() for p in requested.split(',') if p.strip()] if requested else list(CACHE_SECTIONS)
+            unknown = [p for p in providers if p not in CACHE_SECTIONS]
+            if unknown or not providers:
+                return jsonify({'status': 'error',
+                                'message': f"Unknown providers: {', '.join(unknown)}",
+                                'providers': list(CACHE_SECTIONS)}), 400
+
+            job_id = request_refresh(providers)
+            return jsonify({
+                'status': 'accepted',
+                'job_id': job_id,
+                'providers': providers,
+                'status_url': f'/trigger-update/{job_id}'
+            }), 202
         except Exception as e:
             logger.error(f"Error triggering update: {str(e)}")
             return jsonify({'status': 'error', 'message': str(e)}), 500
 
+    @app.route('/trigger-update/<job_id>')
+    @performance_monitor
+    def trigger_update_status(job_id):
+        """Progress of a refresh queued through /trigger-update"""
+        job = refresh_job_status(job_id)
+        if job is None:
+            return jsonify({'status': 'error', 'message': 'Unknown or expired job id'}), 404
+        freshness = section_freshness()
+        for provider, flight in job['providers'].items():
+            flight['freshness'] = freshness.get(provider)
+        return jsonify(job)
+
     @app.route('/refresh-token')
     @https_redirect
+    @performance_monitor
     def refresh_token():
         """Endpoint to refresh Google Calendar token"""
         try:
             success = refresh_credentials()
             if success:
-                update_calendar()  # Refresh calendar data after token refresh
+                calendar_client.reset()  # Pick up the refreshed token
+                request_refresh(['calendar'])  # Refresh calendar data after token refresh
                 return jsonify({'status': 'success', 'message': 'Token refreshed successfully'})
             return jsonify({'status': 'error', 'message': 'Failed to refresh token'}), 400
         except Exception as e:
@@ -487,16 +1352,16 @@ try:
     @rate_limit
     @performance_monitor
     @cache_control(max_age=300)  # Cache for 5 minutes
+    @conditional_get(index_validators)
     def index():
         try:
-            current_time = datetime.now()
-            return render_template('index.html',
-                                time=current_time,
-                                weather=cache['weather'],
-                                calendar=cache['calendar'],
-                                stocks=cache['stocks'],
-                                news=cache['news'],
-                                last_update=cache['last_update'])
+            # The page is rendered by the update_* jobs whenever the data changes
+            slug = location_slug()
+            if slug is None:
+                return serve_rendered('index', 'index.html')
+            if not known_location(slug):
+                return "Unknown location", 404
+            return serve_rendered(location_page('index', 'index.html', slug), 'index.html')
         except Exception as e:
             logger.error(f"Error in index route: {str(e)}", exc_info=True)
             return f"An error occurred: {str(e)}", 500
@@ -504,6 +1369,7 @@ try:
     # Basic health check endpoint that doesn't depend on external services
     @app.route('/health')
     @https_redirect
+    @performance_monitor
     def health_check():
         try:
             health_status = {
@@ -516,7 +1382,31 @@ try:
             logger.error(f"Health check error: {str(e)}")
             return jsonify({'status': 'unhealthy', 'error': str(e)}), 503
 
-    # Full health check endpoint for detailed monitoring
+    # Readiness endpoint reporting which widgets have finished warming up
+    @app.route('/ready')
+    @https_redirect
+    @performance_monitor
+    def readiness_check():
+        with generation_lock:
+            widgets = {section: dict(state) for section, state in readiness.items()}
+        ready = all(state['warm'] for state in widgets.values())
+        return jsonify({
+            'status': 'ready' if ready else 'warming',
+            'uptime_seconds': round((datetime.now(timezone.utc) - startup_time).total_seconds(), 3),
+            'widgets': widgets
+        }), 200 if ready else 503
+
+    # Latency histograms in the Prometheus text format (?format=json for p50/p95/p99 estimates)
+    @app.route('/metrics')
+    def metrics():
+        if request.args.get('format') == 'json':
+            return jsonify(metrics_registry.summary())
+        response = make_response(metrics_registry.render_prometheus())
+        response.headers['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+
+    # Full health check endpoint for detailed monitoring; serves the last probe results (?live=1 re-probes on the leader)
     @app.route('/health/full')
     @https_redirect
     @rate_limit
@@ -550,72 +1440,26 @@ try:
             'scheduler_status': {
                 'running': bool(scheduler and scheduler.running),
                 'jobs': [job.name for job in scheduler.get_jobs()] if scheduler else []
-            }
+            },
+            'circuit_breakers': breaker_states()
         }
 
-        # Check Weather API
-        try:
-            if weather_api_key:
-                weather_url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={weather_api_key}&units=metric"
-                response = requests.get(weather_url, timeout=10)
-                health_status['services']['weather_api'] = {
-                    'status': 'healthy' if response.status_code == 200 else 'error',
-                    'code': response.status_code,
-                    'response': response.json() if response.status_code == 200 else response.text
-                }
-            else:
-                health_status['services']['weather_api'] = {'status': 'error', 'reason': 'no API key'}
-        except Exception as e:
-            logger.error(f"Health check - Weather API error: {str(e)}")
-            health_status['services']['weather_api'] = {'status': 'error', 'error': str(e)}
-
-        # Check Finnhub API
-        try:
-            if finnhub_api_key:
-                headers = {'X-Finnhub-Token': finnhub_api_key}
-                response = requests.get('https://finnhub.io/api/v1/quote?symbol=AAPL', headers=headers, timeout=10)
-                health_status['services']['finnhub_api'] = {
-                    'status': 'healthy' if response.status_code == 200 else 'error',
-                    'code': response.status_code,
-                    'response': response.json() if response.status_code == 200 else response.text
-                }
-            else:
-                health_status['services']['finnhub_api'] = {'status': 'error', 'reason': 'no API key'}
-        except Exception as e:
-            logger.error(f"Health check - Finnhub API error: {str(e)}")
-            health_status['services']['finnhub_api'] = {'status': 'error', 'error': str(e)}
-
-        # Check Google Calendar
-        try:
-            creds = get_calendar_credentials()
-            if creds:
-                service = build('calendar', 'v3', credentials=creds)
-                # Try to list calendars as a test
-                calendar_list = service.calendarList().list().execute()
-                health_status['services']['google_calendar'] = {
-                    'status': 'healthy',
-                    'calendars_found': len(calendar_list.get('items', []))
-                }
-            else:
-                health_status['services']['google_calendar'] = {'status': 'error', 'reason': 'no credentials'}
-        except Exception as e:
-            logger.error(f"Health check - Google Calendar error: {str(e)}")
-            health_status['services']['google_calendar'] = {'status': 'error', 'error': str(e)}
+        if request.args.get('live') == '1' and is_leader():
+            # Followers serve the leader's results rather than probing upstream themselves
+            run_health_probes()
+        probes = latest_health_probes()
+        health_status['services'].update(probes['services'])
+        health_status['probes'] = {
+            'checked_at': datetime.fromtimestamp(probes['checked_at'], timezone.utc).isoformat() if probes['checked_at'] else None,
+            'age_seconds': round(time.time() - probes['checked_at'], 1) if probes['checked_at'] else None,
+            'duration_seconds': probes['duration_seconds'],
+            'interval_seconds': health_probe_seconds
+        }
 
-        # Check Azure App Configuration
-        try:
-            config = config_manager.get_stock_config()
-            if config and 'stocks' in config:
-                health_status['services']['azure_config'] = {
-                    'status': 'healthy',
-                    'config_found': True,
-                    'stocks_configured': len(config['stocks'])
-                }
-            else:
-                health_status['services']['azure_config'] = {'status': 'error', 'reason': 'no configuration'}
-        except Exception as e:
-            logger.error(f"Health check - Azure Config error: {str(e)}")
-            health_status['services']['azure_config'] = {'status': 'error', 'error': str(e)}
+        if not probes['checked_at']:
+            # First probe round still running; don't fail the instance for it
+            health_status['status'] = 'pending'
+            return jsonify(health_status), 200
 
         # Check critical services
         critical_services = ['weather_api', 'finnhub_api']
@@ -652,18 +1496,9 @@ try:
 
     if __name__ == '__main__':
         try:
-            logger.info("Starting scheduler...")
-            scheduler = BackgroundScheduler()
-            scheduler.add_job(func=update_weather, trigger="interval", minutes=5)
-            scheduler.add_job(func=update_calendar, trigger="interval", minutes=15)
-            scheduler.add_job(func=update_stocks, trigger="interval", hours=1)
-            scheduler.add_job(func=update_news, trigger="interval", minutes=30)
-            scheduler.start()
-            
-            # Start update_all in a separate thread
-            import threading
-            threading.Thread(target=update_all, daemon=True).start()
-            
+            # init_scheduler() above already scheduled the refresh jobs (through
+            # refresh_jobs, at their configured intervals) and started the warm-up
+
             # Get port from environment variable for Azure or use default
             port = int(os.environ.get('PORT', 8080))
             logger.info(f"Starting web server on port {port}...")
@@ -0,0 +1,256 @@
+from datetime import datetime, timedelta, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, unquote
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+
+# Local stand-in for the upstream APIs, for development and load tests. It lives
+# under benchmarks/ so it never ships with the app. Run it with
+#   python benchmarks/fake_providers.py --port 8099
+# and point the app at it with e.g.
+#   FINNHUB_BASE_URL=http://127.0.0.1:8099/api/v1
+#   QUOTE_PROVIDER=batch QUOTE_BATCH_URL=http://127.0.0.1:8099/api/v3/quote
+#   NEWS_BASE_URL=http://127.0.0.1:8099/v2
+#   WEATHER_BASE_URL=http://127.0.0.1:8099
+#   GOOGLE_CALENDAR_API_ENDPOINT=http://127.0.0.1:8099/calendar/v3/
+# App Configuration connection strings are always https, so for /kv build the client
+# directly: AzureAppConfigurationClient('http://127.0.0.1:8099', AzureKeyCredential('ZmFrZQ=='), id_credential='fake')
+
+PROVIDERS = ('finnhub', 'newsapi', 'weather', 'calendar', 'appconfig')
+
+DEFAULT_STOCK_CONFIG = {
+    "Tech": ["AAPL", "MSFT", "GOOGL"],
+    "Semiconductors": ["NVDA", "AMD"],
+    "Electric Vehicles": ["TSLA"]
+}
+
+def provider_for(path):
+    """Which upstream a request path belongs to (latency, errors and quotas are per provider)"""
+    if path.startswith('/api/'):
+        return 'finnhub'
+    if path.startswith('/v2/'):
+        return 'newsapi'
+    if path.startswith(('/geo/', '/data/')):
+        return 'weather'
+    if path.startswith('/calendar/'):
+        return 'calendar'
+    if path.startswith('/kv'):
+        return 'appconfig'
+    return None
+
+def fake_price(symbol, now=None):
+    """Deterministic per-symbol base price with a slow drift, so quotes move between calls"""
+    seed = int(hashlib.md5(symbol.encode('utf-8')).hexdigest()[:8], 16)
+    base = 20 + seed % 480
+    previous_close = round(base, 2)
+    drift = math.sin((now or time.time()) / 30 + seed) * base * 0.02
+    return round(base + drift, 2), previous_close
+
+def fake_articles(key, count):
+    """NewsAPI-style articles; every feed shares a couple of top stories so dedupe has work to do"""
+    published = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(time.time() // 300 * 300))
+    urls = [f'https://news.example.com/top/{i}' for i in range(2)]
+    urls += [f'https://news.example.com/{key}/{i}' for i in range(max(0, count - 2))]
+    return [{'title': f'Story {url.rsplit("/", 2)[-2]} {url.rsplit("/", 1)[-1]}', 'description': '', 'url': url,
+             'source': {'name': 'Fake News Wire'}, 'publishedAt': published} for url in urls]
+
+def fake_place(name):
+    seed = int(hashlib.md5(name.lower().encode('utf-8')).hexdigest()[:8], 16)
+    return round((seed % 12000) / 100 - 60, 4), round((seed // 12000 % 36000) / 100 - 180, 4)
+
+def fake_weather(lat, lon):
+    """OpenWeatherMap-style current weather that only changes every ten minutes"""
+    seed = int(abs(lat * 1000 + lon * 10) + time.time() // 600)
+    return {'name': f'Station {abs(int(lat))}-{abs(int(lon))}',
+            'main': {'temp': 5 + seed % 25, 'humidity': 30 + seed % 60},
+            'weather': [{'description': ('clear sky', 'few clouds', 'light rain')[seed % 3]}],
+            'wind': {'speed': (seed % 80) / 10}}
+
+def fake_events(time_min, time_max, count=8):
+    """Calendar API events spread over [time_min, time_max), a few hours apart"""
+    start = datetime.fromisoformat(time_min.replace('Z', '+00:00')) if time_min else \
+        datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    end = datetime.fromisoformat(time_max.replace('Z', '+00:00')) if time_max else start + timedelta(days=1)
+    events = []
+    for i in range(count):
+        event_start = start + timedelta(hours=13 + 3 * i)
+        if event_start >= end:
+            break
+        events.append({'id': f'event{i}', 'status': 'confirmed', 'summary': f'Meeting {i + 1}',
+                       'start': {'dateTime': event_start.isoformat()},
+                       'end': {'dateTime': (event_start + timedelta(minutes=45)).isoformat()}})
+    return events
+
+class FakeProviderHandler(BaseHTTPRequestHandler):
+    """Serves Finnhub-style quotes, batch quotes, NewsAPI headlines, OpenWeatherMap weather,
+    Google Calendar events and an Azure App Configuration key"""
+
+    protocol_version = 'HTTP/1.1'  # keep-alive, like the real providers
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, payload, validators=False, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if validators and status == 200 and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if validators:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'max-age=0')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _over_quota(self, provider, quota):
+        """Count a request against the provider's per-minute quota; True if it is used up"""
+        server = self.server
+        window = int(time.time() // 60)
+        with server.lock:
+            if server.quota_window.get(provider) != window:
+                server.quota_window[provider] = window
+                server.quota_used[provider] = 0
+            server.quota_used[provider] += 1
+            return server.quota_used[provider] > quota
+
+    def _send_setting(self, key):
+        """App Configuration key-value with an etag; If-None-Match answers 304"""
+        if key != 'stocks':
+            self._send_json(404, {'title': 'Not Found', 'status': 404})
+            return
+        value = json.dumps({'stocks': self.server.stock_config})
+        etag = hashlib.md5(value.encode('utf-8')).hexdigest()
+        if self.headers.get('If-None-Match', '').strip('"') == etag:
+            self.send_response(304)
+            self.send_header('ETag', f'"{etag}"')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = json.dumps({'etag': etag, 'key': key, 'label': None, 'content_type': 'application/json',
+                           'value': value, 'tags': {}, 'locked': False,
+                           'last_modified': '2024-01-01T00:00:00+00:00'}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/vnd.microsoft.appconfig.kv+json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', f'"{etag}"')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        provider = provider_for(url.path)
+        settings = server.settings(provider)
+        with server.lock:
+            server.requests += 1
+            server.counts[provider] = server.counts.get(provider, 0) + 1
+        if settings['latency']:
+            time.sleep(settings['latency'])
+        if settings['quota'] and self._over_quota(provider, settings['quota']):
+            with server.lock:
+                server.throttled += 1
+            # Like the real providers, say when the next quota window opens
+            self._send_json(429, {'error': 'quota exceeded'},
+                            headers={'Retry-After': str(60 - int(time.time()) % 60)})
+            return
+        if settings['error_rate'] and random.random() < settings['error_rate']:
+            self._send_json(503, {'error': 'simulated outage'})
+            return
+
+        if url.path == '/api/v1/quote':
+            symbol = query.get('symbol', [''])[0]
+            price, previous_close = fake_price(symbol)
+            self._send_json(200, {'c': price, 'pc': previous_close, 't': int(time.time())})
+        elif url.path.startswith('/api/v3/quote/'):
+            symbols = [s for s in unquote(url.path[len('/api/v3/quote/'):]).split(',') if s]
+            quotes = []
+            for symbol in symbols:
+                price, previous_close = fake_price(symbol)
+                quotes.append({'symbol': symbol, 'price': price, 'previousClose': previous_close,
+                               'changesPercentage': round((price - previous_close) / previous_close * 100, 4)})
+            self._send_json(200, quotes)
+        elif url.path == '/v2/top-headlines':
+            key = (query.get('category') or query.get('sources') or query.get('q') or ['general'])[0]
+            count = int(query.get('pageSize', ['20'])[0])
+            articles = fake_articles(key, count)
+            self._send_json(200, {'status': 'ok', 'totalResults': len(articles), 'articles': articles}, validators=True)
+        elif url.path == '/geo/1.0/direct':
+            name = query.get('q', [''])[0]
+            lat, lon = fake_place(name)
+            self._send_json(200, [{'name': name, 'lat': lat, 'lon': lon}])
+        elif url.path == '/data/2.5/weather':
+            if 'lat' in query:
+                lat, lon = float(query['lat'][0]), float(query['lon'][0])
+            else:
+                lat, lon = fake_place(query.get('q', [''])[0])
+            self._send_json(200, fake_weather(lat, lon), validators=True)
+        elif url.path == '/calendar/v3/users/me/calendarList':
+            self._send_json(200, {'items': [{'id': 'primary', 'summary': 'Fake calendar'}]})
+        elif url.path.startswith('/calendar/v3/calendars/') and url.path.endswith('/events'):
+            if 'syncToken' in query:
+                # Nothing changes between syncs
+                self._send_json(200, {'items': [], 'nextSyncToken': query['syncToken'][0]})
+            else:
+                events = fake_events(query.get('timeMin', [None])[0], query.get('timeMax', [None])[0])
+                self._send_json(200, {'items': events, 'nextSyncToken': f'sync-{int(time.time())}'})
+        elif url.path.startswith('/kv/'):
+            self._send_setting(unquote(url.path[len('/kv/'):]))
+        else:
+            self._send_json(404, {'error': f'unknown path {url.path}'})
+
+def start_fake_server(host='127.0.0.1', port=0, latency=0.0, error_rate=0.0, quota=0, overrides=None,
+                      stock_config=None, verbose=False):
+    """Start the fake provider server on a background thread; returns (server, base_url).
+
+    latency (seconds), error_rate (fraction answered 503) and quota (requests per
+    minute before 429s, 0 = unlimited) apply to every provider unless
+    overrides[provider] sets its own.
+    """
+    server = ThreadingHTTPServer((host, port), FakeProviderHandler)
+    server.daemon_threads = True
+    defaults = {'latency': latency, 'error_rate': error_rate, 'quota': quota}
+    per_provider = {provider: dict(defaults, **(overrides or {}).get(provider, {})) for provider in PROVIDERS}
+    server.settings = lambda provider: per_provider.get(provider, defaults)
+    server.stock_config = stock_config or DEFAULT_STOCK_CONFIG
+    server.verbose = verbose
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.throttled = 0
+    server.counts = {}
+    server.quota_window = {}
+    server.quota_used = {}
+    threading.Thread(target=server.serve_forever, name='fake-providers', daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run the fake upstream provider server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--latency-ms', type=float, default=0, help='delay added to every response')
+    parser.add_argument('--error-rate', type=float, default=0, help='fraction of requests answered with 503')
+    parser.add_argument('--quota', type=int, default=0, help='requests per minute per provider before 429s')
+    args = parser.parse_args()
+
+    server, base_url = start_fake_server(args.host, args.port, args.latency_ms / 1000, args.error_rate,
+                                         args.quota, verbose=True)
+    print(f"Fake providers listening on {base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,261 @@
+"""Load benchmarks for the dashboard against local stand-ins for every upstream API.
+
+Starts fake_providers on a random port (OpenWeatherMap, Finnhub/batch quotes,
+NewsAPI, Google Calendar and App Configuration), points the app at it and
+times the hot paths under concurrent load. Results are printed as JSON:
+throughput and latency percentiles per scenario, plus the upstream request
+counts, so two runs can be diffed between releases.
+
+    python benchmarks/run.py --iterations 200 --concurrency 8 --latency-ms 20
+    python benchmarks/run.py --output after.json --baseline before.json
+
+With --baseline the run exits non-zero when a scenario's p95 latency grew by
+more than --tolerance (default 25%).
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fake_providers import start_fake_server  # noqa: E402
+
+PERCENTILES = (50, 90, 95, 99)
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def measure(func, iterations, concurrency):
+    """Call func iterations times from concurrency threads; returns the scenario's stats.
+
+    func returns a truthy value on success; exceptions and falsy results count as errors.
+    """
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+
+    def call(_):
+        start = time.perf_counter()
+        try:
+            ok = bool(func())
+        except Exception:
+            ok = False
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            if not ok:
+                errors[0] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(call, range(iterations)))
+    duration = time.perf_counter() - started
+
+    latencies.sort()
+    latency_ms = {'min': latencies[0] * 1000, 'mean': sum(latencies) / len(latencies) * 1000,
+                  'max': latencies[-1] * 1000}
+    for pct in PERCENTILES:
+        latency_ms[f'p{pct}'] = percentile(latencies, pct) * 1000
+    return {
+        'iterations': iterations,
+        'concurrency': concurrency,
+        'errors': errors[0],
+        'duration_seconds': round(duration, 4),
+        'throughput_per_second': round(iterations / duration, 2) if duration else None,
+        'latency_ms': {key: round(value, 3) for key, value in latency_ms.items()}
+    }
+
+def stock_config(symbol_count):
+    """An App Configuration watchlist of symbol_count symbols, ten per category"""
+    if not symbol_count:
+        return None
+    symbols = [f'SYM{i:04d}' for i in range(symbol_count)]
+    return {f'Group {i // 10 + 1}': symbols[i:i + 10] for i in range(0, symbol_count, 10)}
+
+def configure_environment(base_url, state_dir, args):
+    """Point every provider at the fake server before the app is imported"""
+    # Never let a benchmark reach a real API or a real App Configuration store
+    for name in ('AZURE_APP_CONFIG_CONNECTION_STRING', 'AZURE_APP_CONFIG_ENDPOINT', 'HTTP_CACHE_DIR', 'BOARDS'):
+        os.environ.pop(name, None)
+    os.environ.update({
+        'WEATHER_API_KEY': 'benchmark',
+        'FINNHUB_API_KEY': 'benchmark',
+        'NEWS_API_KEY': 'benchmark',
+        'QUOTE_API_KEY': 'benchmark',
+        'WEATHER_BASE_URL': base_url,
+        'FINNHUB_BASE_URL': f'{base_url}/api/v1',
+        'QUOTE_BATCH_URL': f'{base_url}/api/v3/quote',
+        'NEWS_BASE_URL': f'{base_url}/v2',
+        'GOOGLE_CALENDAR_API_ENDPOINT': f'{base_url}/calendar/v3/',
+        'QUOTE_PROVIDER': args.quote_provider,
+        'SCHEDULER_LEADER_ELECTION': 'false',
+        'SHARED_STATE_DIR': state_dir,
+        'CACHE_SNAPSHOT_DIR': state_dir,
+        'RATE_LIMIT_BACKEND': 'local'
+    })
+    # Client-side throttles would otherwise dominate the numbers; the fake's --quota models provider limits
+    unlimited = str(10 ** 9)
+    for name in ('RATE_LIMIT_PER_MINUTE', 'FINNHUB_CALLS_PER_MINUTE',
+                 'QUOTE_CALLS_PER_MINUTE', 'NEWS_CALLS_PER_MINUTE'):
+        os.environ.setdefault(name, unlimited)
+    os.environ.setdefault('HEALTH_PROBE_SECONDS', '3600')
+
+def wait_until_ready(client, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        response = client.get('/ready', headers={'X-Forwarded-Proto': 'https'})
+        if response.status_code == 200:
+            return True
+        time.sleep(0.1)
+    return False
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+def compare(results, baseline, tolerance):
+    """Scenarios whose p95 latency grew by more than tolerance against a previous run"""
+    regressions = []
+    for name, current in results['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            continue
+        before, after = previous['latency_ms']['p95'], current['latency_ms']['p95']
+        if before and after > before * (1 + tolerance):
+            regressions.append({'scenario': name, 'p95_before_ms': before, 'p95_after_ms': after,
+                                'change': round(after / before - 1, 3)})
+    return regressions
+
+def run(args):
+    server, base_url = start_fake_server(
+        latency=args.latency_ms / 1000, error_rate=args.error_rate, quota=args.quota,
+        stock_config=stock_config(args.symbols), verbose=args.verbose)
+    state_dir = tempfile.mkdtemp(prefix='dashboard-bench-')
+    configure_environment(base_url, state_dir, args)
+
+    # Configure logging before app.py does, so its records go to stderr and not into the JSON
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, stream=sys.stderr)
+
+    from azure.appconfiguration import AzureAppConfigurationClient
+    from azure.core.credentials import AzureKeyCredential
+    from google.oauth2.credentials import Credentials
+    from calendar_setup import calendar_client
+    calendar_client.creds = Credentials('benchmark')  # a token with no expiry never refreshes
+
+    import app as dashboard
+    from middleware import RateLimiter
+
+    # Connection strings are always https, so build the App Configuration client directly
+    dashboard.config_manager.client = AzureAppConfigurationClient(
+        base_url, AzureKeyCredential('YmVuY2htYXJr'), id_credential='benchmark')
+    dashboard.check_stock_config()
+
+    client = dashboard.app.test_client()
+    if not wait_until_ready(client, args.warmup_timeout):
+        logging.warning("Dashboard did not finish warming up; benchmarking anyway")
+
+    def request(path, encoding=None):
+        """A scenario GETting path; with an encoding the response must come back compressed"""
+        headers = {'X-Forwarded-Proto': 'https', 'Accept-Encoding': encoding or 'identity'}
+
+        def get():
+            response = client.get(path, headers=headers)
+            return response.status_code == 200 and (encoding is None or 'Content-Encoding' in response.headers)
+        return get
+
+    limiter = RateLimiter(requests_per_minute=10 ** 9)
+    addresses = [f'10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}' for i in range(10000)]
+
+    iterations, concurrency = args.iterations, args.concurrency
+    scenarios = {
+        'get_stock_data': (dashboard.get_stock_data, iterations, concurrency),
+        'get_news_data': (dashboard.get_news_data, iterations, concurrency),
+        # update_all is single-flight per provider, so concurrent calls would only coalesce
+        'update_all': (lambda: dashboard.update_all() or True, max(1, iterations // 10), 1),
+        'stock_config_refresh': (lambda: dashboard.config_manager.refresh_stock_config() or True,
+                                 iterations, concurrency),
+        'render_index': (lambda: dashboard.render_index_page() or True, iterations, concurrency),
+        'index_identity': (request('/'), iterations, concurrency),
+        'index_gzip': (request('/', 'gzip'), iterations, concurrency),
+        'index_br': (request('/', 'br, gzip'), iterations, concurrency),
+        'api_snapshot_gzip': (request('/api/snapshot', 'gzip'), iterations, concurrency),
+        'rate_limiter_is_allowed': (lambda: limiter.is_allowed(random.choice(addresses)),
+                                    iterations * 100, concurrency)
+    }
+    selected = args.scenarios.split(',') if args.scenarios else list(scenarios)
+    unknown = [name for name in selected if name not in scenarios]
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(unknown)} (choose from {', '.join(scenarios)})")
+
+    results = {}
+    for name in selected:
+        func, count, workers = scenarios[name]
+        requests_before = server.requests
+        results[name] = measure(func, count, workers)
+        results[name]['upstream_requests'] = server.requests - requests_before
+        logging.info(f"{name}: {results[name]}")
+
+    if dashboard.scheduler is not None and dashboard.scheduler.running:
+        dashboard.scheduler.shutdown(wait=False)
+    server.shutdown()
+
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'settings': {'iterations': iterations, 'concurrency': concurrency, 'latency_ms': args.latency_ms,
+                     'error_rate': args.error_rate, 'quota_per_minute': args.quota,
+                     'quote_provider': args.quote_provider, 'symbols': len(dashboard.stock_watchlist[1])},
+        'scenarios': results,
+        'upstream': {'requests': server.requests, 'throttled': server.throttled, 'by_provider': server.counts},
+        'http_cache': dashboard.http_cache.stats()
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the dashboard against fake upstream providers')
+    parser.add_argument('--iterations', type=int, default=200, help='calls per scenario')
+    parser.add_argument('--concurrency', type=int, default=8, help='threads calling each scenario')
+    parser.add_argument('--latency-ms', type=float, default=20, help='delay the fake providers add per request')
+    parser.add_argument('--error-rate', type=float, default=0, help='fraction of upstream requests answered 503')
+    parser.add_argument('--quota', type=int, default=0, help='upstream requests per minute per provider before 429s')
+    parser.add_argument('--symbols', type=int, default=0, help='watchlist size served by App Configuration')
+    parser.add_argument('--quote-provider', choices=('finnhub', 'batch'), default='finnhub')
+    parser.add_argument('--scenarios', help='comma-separated subset of scenarios to run')
+    parser.add_argument('--warmup-timeout', type=float, default=30)
+    parser.add_argument('--output', help='also write the results to this file')
+    parser.add_argument('--baseline', help='previous results file to compare p95 latencies against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed p95 growth before a regression')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    results = run(args)
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            results['regressions'] = compare(results, json.load(f), args.tolerance)
+        exit_code = 1 if results['regressions'] else 0
+
+    output = json.dumps(results, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    sys.exit(exit_code)
@@ -0,0 +1,74 @@
+from news_pipeline import parse_news_feeds
+from weather_service import slugify
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+def load_board_config(value):
+    """Parse BOARDS: inline JSON or the path of a JSON file; {} if unset or invalid"""
+    if not value:
+        return {}
+    try:
+        if value.lstrip().startswith('{'):
+            return json.loads(value)
+        with open(value, encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        logger.error(f"Error loading board profiles: {str(e)}")
+        return {}
+
+def parse_boards(config):
+    """Normalize board profiles.
+
+    Each profile may set "title", "city", "stocks" ({category: [symbols]}),
+    "news" (a NEWS_FEEDS-style string) and "calendar_id"; anything left out
+    falls back to the default dashboard.
+    """
+    boards = {}
+    for name, profile in (config or {}).items():
+        slug = slugify(name)
+        if not slug or not isinstance(profile, dict):
+            logger.error(f"Skipping invalid board profile {name!r}")
+            continue
+        categories = profile.get('stocks')
+        symbols = []
+        seen = set()
+        for stocks in (categories or {}).values():
+            for symbol in stocks:
+                if symbol not in seen:
+                    seen.add(symbol)
+                    symbols.append(symbol)
+        boards[slug] = {
+            'name': slug,
+            'title': profile.get('title') or name,
+            'city': profile.get('city'),
+            'location': slugify(profile['city']) if profile.get('city') else None,
+            'categories': categories or None,
+            'symbols': symbols,
+            'news_feeds': parse_news_feeds(profile['news']) if profile.get('news') else None,
+            'calendar_id': profile.get('calendar_id') or 'primary'
+        }
+    return boards
+
+def union_feeds(default_feeds, boards):
+    """Default news feeds plus every board feed, each key once"""
+    feeds = list(default_feeds)
+    keys = {feed['key'] for feed in feeds}
+    for board in boards.values():
+        for feed in board['news_feeds'] or []:
+            if feed['key'] not in keys:
+                keys.add(feed['key'])
+                feeds.append(feed)
+    return feeds
+
+def union_symbols(boards):
+    """Every symbol a board watches, in first-seen order"""
+    symbols = []
+    seen = set()
+    for board in boards.values():
+        for symbol in board['symbols']:
+            if symbol not in seen:
+                seen.add(symbol)
+                symbols.append(symbol)
+    return symbols
@@ -0,0 +1,96 @@
+from datetime import datetime, timezone
+import threading
+import time
+
+def format_age(seconds):
+    """Human readable age used for the "as of" labels"""
+    if seconds < 60:
+        return 'just now'
+    if seconds < 3600:
+        return f"{int(seconds // 60)} min ago"
+    if seconds < 86400:
+        return f"{int(seconds // 3600)} h ago"
+    return f"{int(seconds // 86400)} d ago"
+
+class CacheEntry:
+    """One cache section: the last good value plus its freshness bookkeeping.
+
+    A failed refresh keeps the last good value and only records the error; the
+    value is dropped once it is older than max_stale. Failures also push the
+    next allowed attempt out with exponential backoff so a flaky provider is
+    not retried in a tight loop.
+    """
+
+    def __init__(self, ttl, max_stale, retry_backoff=30):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.retry_backoff = retry_backoff
+        self.lock = threading.Lock()
+        self.value = None
+        self.fetched_at = None
+        self.last_error = None
+        self.failures = 0
+        self.retry_at = 0
+        self.from_snapshot = False
+
+    def age(self, now=None):
+        if self.fetched_at is None:
+            return None
+        return max(0, (now or time.time()) - self.fetched_at)
+
+    def has_value(self, now=None):
+        """True while there is a value young enough to keep serving"""
+        age = self.age(now)
+        return age is not None and age <= self.max_stale
+
+    def is_stale(self, now=None):
+        age = self.age(now)
+        return age is None or age > self.ttl or self.last_error is not None or self.from_snapshot
+
+    def in_backoff(self, now=None):
+        return (now or time.time()) < self.retry_at
+
+    def record_success(self, value, fetched_at=None):
+        with self.lock:
+            self.value = value
+            self.fetched_at = fetched_at if fetched_at is not None else time.time()
+            self.last_error = None
+            self.failures = 0
+            self.retry_at = 0
+            self.from_snapshot = False
+
+    def record_failure(self, error, now=None):
+        now = now or time.time()
+        with self.lock:
+            self.last_error = error
+            self.failures += 1
+            # Cap at half the TTL so a failing section is retried at least twice per
+            # TTL. Scheduled runs inside the backoff are skipped, so a provider polled
+            # more often than that (calendar: every minute) skips several runs.
+            self.retry_at = now + min(self.ttl / 2, self.retry_backoff * (2 ** (self.failures - 1)))
+
+    def restore(self, value, fetched_at, last_error=None, from_snapshot=False):
+        """Load a value fetched elsewhere (disk snapshot or the shared store)"""
+        with self.lock:
+            self.value = value
+            self.fetched_at = fetched_at
+            self.last_error = last_error
+            self.from_snapshot = from_snapshot
+
+    def served_value(self, placeholder):
+        """The value to show: the last good one, or placeholder once it is too old"""
+        return self.value if self.has_value() else placeholder
+
+    def describe(self, now=None):
+        """Freshness details for templates and the JSON API"""
+        now = now or time.time()
+        age = self.age(now)
+        return {
+            'fetched_at': datetime.fromtimestamp(self.fetched_at, timezone.utc).isoformat() if self.fetched_at else None,
+            'age_seconds': round(age, 1) if age is not None else None,
+            'age_text': format_age(age) if age is not None else None,
+            'ttl': self.ttl,
+            'stale': self.is_stale(now),
+            'last_error': self.last_error,
+            'failures': self.failures
+        }
@@ -0,0 +1,56 @@
+import json
+import os
+import tempfile
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+class CacheSnapshot:
+    """Per-section JSON snapshots of the dashboard cache on disk.
+
+    Each section lives in its own file and is replaced atomically (write to a
+    temporary file, fsync, then os.replace), so a crash mid-write never leaves
+    a truncated snapshot behind.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, section):
+        return os.path.join(self.directory, f'{section}.json')
+
+    def save(self, section, value, fetched_at=None):
+        """Atomically write one section with the time it was fetched"""
+        record = {
+            'section': section,
+            'fetched_at': fetched_at if fetched_at is not None else time.time(),
+            'value': value
+        }
+        handle = tempfile.NamedTemporaryFile('w', dir=self.directory, prefix=f'.{section}.',
+                                             suffix='.tmp', delete=False, encoding='utf-8')
+        try:
+            with handle:
+                json.dump(record, handle, default=str)
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(handle.name, self._path(section))
+        except Exception:
+            try:
+                os.unlink(handle.name)
+            except OSError:
+                pass
+            raise
+
+    def load(self, section):
+        """Return (value, fetched_at) for a section, or None if there is no usable snapshot"""
+        try:
+            with open(self._path(section), encoding='utf-8') as f:
+                record = json.load(f)
+            return record['value'], record['fetched_at']
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Ignoring unreadable {section} snapshot: {str(e)}")
+            return None
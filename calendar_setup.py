@@ -1,6 +1,12 @@
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build
+from datetime import datetime, timedelta
+import httplib2
+import requests
+import threading
 import os
 import pickle
 import logging
@@ -113,4 +119,80 @@ def get_calendar_credentials():
 
     except Exception as e:
         logger.error(f"Error in get_calendar_credentials: {str(e)}")
-        return None 
\ No newline at end of file
+        return None
+
+class CalendarClient:
+    """Long-lived Google Calendar client.
+
+    Decoded credentials are kept in memory and refreshed shortly before they
+    expire. Each thread reuses its own built service (httplib2 is not thread
+    safe) with the bundled static discovery document and a keep-alive
+    connection, so fan calls out on long-lived threads rather than a new pool
+    per call.
+    """
+
+    def __init__(self, refresh_margin=300, timeout=10):
+        self.refresh_margin = timedelta(seconds=refresh_margin)
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.creds = None
+        self.generation = 0
+        self.local = threading.local()
+        self.refresh_session = requests.Session()
+
+    def _needs_refresh(self, creds):
+        if creds.expired:
+            return True
+        # google-auth stores expiry as naive UTC
+        return creds.expiry is not None and creds.expiry - datetime.utcnow() < self.refresh_margin
+
+    def get_credentials(self):
+        """Return valid credentials, refreshing them proactively before expiry"""
+        with self.lock:
+            try:
+                if self.creds is None:
+                    self.creds = get_credentials_from_env()
+                    if not self.creds:
+                        return None
+
+                if self._needs_refresh(self.creds):
+                    if not self.creds.refresh_token:
+                        logger.error("No refresh token available")
+                    else:
+                        logger.info("Credentials expiring, refreshing proactively")
+                        self.creds.refresh(Request(session=self.refresh_session))
+                        save_credentials_to_env(self.creds)
+
+                if not self.creds.valid:
+                    logger.error("No valid credentials available")
+                    return None
+                return self.creds
+            except Exception as e:
+                logger.error(f"Error getting cached calendar credentials: {str(e)}")
+                return None
+
+    def get_service(self):
+        """Return this thread's Calendar service, building it on first use"""
+        creds = self.get_credentials()
+        if not creds:
+            return None
+
+        cached = getattr(self.local, 'service', None)
+        if cached is not None and cached[0] == self.generation and cached[1] is creds:
+            return cached[2]
+
+        http = AuthorizedHttp(creds, http=httplib2.Http(timeout=self.timeout))
+        # GOOGLE_CALENDAR_API_ENDPOINT points the client at a stand-in server (benchmarks)
+        api_endpoint = os.getenv('GOOGLE_CALENDAR_API_ENDPOINT')
+        service = build('calendar', 'v3', http=http, static_discovery=True, cache_discovery=False,
+                        client_options={'api_endpoint': api_endpoint} if api_endpoint else None)
+        self.local.service = (self.generation, creds, service)
+        return service
+
+    def reset(self):
+        """Drop cached credentials and services, e.g. after a manual token refresh"""
+        with self.lock:
+            self.creds = None
+            self.generation += 1
+
+calendar_client = CalendarClient()
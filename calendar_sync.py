@@ -0,0 +1,174 @@
+from googleapiclient.errors import HttpError
+from datetime import datetime, timedelta
+import bisect
+import threading
+import logging
+import pytz
+
+logger = logging.getLogger(__name__)
+
+def parse_event_time(value, tz):
+    """Parse a Calendar API dateTime or all-day date into an aware datetime"""
+    if 'T' in value:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).astimezone(tz)
+    return tz.localize(datetime.strptime(value, '%Y-%m-%d'))
+
+def format_event(event, tz):
+    """Convert a Calendar API event into the dashboard's event dict"""
+    start = event['start'].get('dateTime', event['start'].get('date'))
+    end = event['end'].get('dateTime', event['end'].get('date'))
+
+    if 'T' in start:  # This is a datetime
+        time_str = parse_event_time(start, tz).strftime('%H:%M')
+    else:  # This is a date
+        time_str = 'All day'
+
+    return {
+        'time': time_str,
+        'summary': event.get('summary', '(No title)'),
+        'start': start,
+        'end': end
+    }
+
+class CalendarEventStore:
+    """Events keyed by id, with an index kept sorted by start time"""
+
+    def __init__(self):
+        self.events = {}
+        self.order = []  # sorted (start, event_id) pairs
+
+    def clear(self):
+        self.events.clear()
+        self.order.clear()
+
+    def upsert(self, event_id, start, event):
+        self.remove(event_id)
+        self.events[event_id] = (start, event)
+        bisect.insort(self.order, (start, event_id))
+
+    def remove(self, event_id):
+        existing = self.events.pop(event_id, None)
+        if existing is not None:
+            index = bisect.bisect_left(self.order, (existing[0], event_id))
+            if index < len(self.order) and self.order[index] == (existing[0], event_id):
+                del self.order[index]
+
+    def between(self, window_start, window_end, limit=None):
+        """Events overlapping [window_start, window_end), in start order"""
+        results = []
+        for start, event_id in self.order:
+            if start >= window_end:
+                break
+            event = self.events[event_id][1]
+            if parse_event_time(event['end'], start.tzinfo) > window_start:
+                results.append(event)
+                if limit and len(results) >= limit:
+                    break
+        return results
+
+class CalendarSync:
+    """Incremental Calendar API sync driven by nextSyncToken.
+
+    A full sync lists the current window (today plus window_days) and keeps the
+    returned sync token; later syncs fetch only the changes since that token.
+    The token is dropped and a full resync runs when the API answers 410 Gone
+    or when the day rolls over past the synced window.
+    """
+
+    def __init__(self, calendar_client, calendar_id='primary', timezone='America/New_York',
+                 window_days=7, max_results=20):
+        self.calendar_client = calendar_client
+        self.calendar_id = calendar_id
+        self.tz = pytz.timezone(timezone)
+        self.window_days = window_days
+        self.max_results = max_results
+        self.store = CalendarEventStore()
+        self.sync_token = None
+        self.window_start = None
+        self.lock = threading.Lock()
+        self.full_syncs = 0
+        self.incremental_syncs = 0
+
+    def _today(self):
+        now = datetime.now(self.tz)
+        start_of_day = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        return start_of_day, start_of_day + timedelta(days=1)
+
+    def _apply(self, items):
+        for event in items:
+            event_id = event.get('id')
+            if not event_id:
+                continue
+            if event.get('status') == 'cancelled' or 'start' not in event:
+                self.store.remove(event_id)
+                continue
+            formatted = format_event(event, self.tz)
+            self.store.upsert(event_id, parse_event_time(formatted['start'], self.tz), formatted)
+
+    def _list_all(self, service, **params):
+        """Page through events.list and return the final nextSyncToken"""
+        page_token = None
+        while True:
+            result = service.events().list(
+                calendarId=self.calendar_id,
+                singleEvents=True,
+                pageToken=page_token,
+                **params
+            ).execute()
+            self._apply(result.get('items', []))
+            page_token = result.get('nextPageToken')
+            if not page_token:
+                return result.get('nextSyncToken')
+
+    def _full_sync(self, service, start_of_day):
+        window_end = start_of_day + timedelta(days=self.window_days)
+        logger.info(f"Full calendar sync between {start_of_day} and {window_end}")
+        self.store.clear()
+        self.sync_token = self._list_all(
+            service,
+            timeMin=start_of_day.astimezone(pytz.UTC).isoformat(),
+            timeMax=window_end.astimezone(pytz.UTC).isoformat()
+        )
+        self.window_start = start_of_day
+        self.full_syncs += 1
+
+    def sync(self):
+        """Bring the store up to date and return today's formatted events"""
+        service = self.calendar_client.get_service()
+        if not service:
+            logger.error("Failed to get calendar credentials")
+            return None
+
+        with self.lock:
+            start_of_day, end_of_day = self._today()
+            window_expired = (
+                self.window_start is None or
+                end_of_day > self.window_start + timedelta(days=self.window_days)
+            )
+
+            if self.sync_token is None or window_expired:
+                self._full_sync(service, start_of_day)
+            else:
+                try:
+                    self.sync_token = self._list_all(service, syncToken=self.sync_token) or self.sync_token
+                    self.incremental_syncs += 1
+                except HttpError as e:
+                    if e.resp.status != 410:
+                        raise
+                    logger.warning("Calendar sync token expired (410), running full resync")
+                    self.sync_token = None
+                    self._full_sync(service, start_of_day)
+
+            events = self.store.between(start_of_day, end_of_day, limit=self.max_results)
+            logger.info(f"Found {len(events)} events for today ({len(self.store.events)} events in sync window)")
+            return events
+
+    def status(self):
+        with self.lock:
+            return {
+                'has_sync_token': self.sync_token is not None,
+                'window_start': self.window_start.isoformat() if self.window_start else None,
+                'events_stored': len(self.store.events),
+                'full_syncs': self.full_syncs,
+                'incremental_syncs': self.incremental_syncs
+            }
@@ -0,0 +1,142 @@
+from collections import deque
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose breaker is open"""
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker for one upstream provider.
+
+    Outcomes of the last `window` calls are kept; once at least `minimum_calls`
+    have been seen and the failure rate reaches `failure_rate` the breaker opens
+    and calls fail fast for `open_seconds`. After that up to `half_open_calls`
+    trial calls are let through: a success closes the breaker, a failure opens
+    it again. Successful calls slower than `slow_call_seconds` count as failures.
+    """
+
+    def __init__(self, name, failure_rate=0.5, minimum_calls=5, window=20, open_seconds=60,
+                 half_open_calls=1, slow_call_seconds=None):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.minimum_calls = minimum_calls
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.slow_call_seconds = slow_call_seconds
+        self.lock = threading.Lock()
+        self.outcomes = deque(maxlen=window)
+        self.state = CLOSED
+        self.opened_at = None
+        self.trials = 0
+        self.counters = {'opened': 0, 'rejected': 0}
+
+    def _open(self, now):
+        self.state = OPEN
+        self.opened_at = now
+        self.trials = 0
+        self.counters['opened'] += 1
+        logger.warning(f"Circuit for {self.name} opened for {self.open_seconds}s")
+
+    def is_open(self, now=None):
+        """True while calls would be rejected; does not consume a half-open trial"""
+        now = now or time.time()
+        with self.lock:
+            if self.state == OPEN:
+                return now < self.opened_at + self.open_seconds
+            if self.state == HALF_OPEN:
+                return self.trials >= self.half_open_calls
+            return False
+
+    def allow_request(self, now=None):
+        """Reserve a call slot; every allowed call must be followed by record_*"""
+        now = now or time.time()
+        with self.lock:
+            if self.state == OPEN and now >= self.opened_at + self.open_seconds:
+                self.state = HALF_OPEN
+                self.trials = 0
+                logger.info(f"Circuit for {self.name} half-open, allowing trial calls")
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and self.trials < self.half_open_calls:
+                self.trials += 1
+                return True
+            self.counters['rejected'] += 1
+            return False
+
+    def record_success(self, duration=None, now=None):
+        if self.slow_call_seconds is not None and duration is not None and duration > self.slow_call_seconds:
+            self.record_failure(now)
+            return
+        with self.lock:
+            if self.state == HALF_OPEN:
+                self.state = CLOSED
+                self.outcomes.clear()
+                logger.info(f"Circuit for {self.name} closed")
+            self.outcomes.append(True)
+
+    def record_failure(self, now=None):
+        now = now or time.time()
+        with self.lock:
+            if self.state == HALF_OPEN:
+                self._open(now)
+                return
+            if self.state == OPEN:
+                return
+            self.outcomes.append(False)
+            failures = self.outcomes.count(False)
+            if len(self.outcomes) >= self.minimum_calls and failures / len(self.outcomes) >= self.failure_rate:
+                self._open(now)
+
+    def call(self, func, *args, **kwargs):
+        """Run func through the breaker; exceptions count as failures"""
+        if not self.allow_request():
+            raise CircuitOpenError(f"Circuit for {self.name} is open")
+        start_time = time.time()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success(time.time() - start_time)
+        return result
+
+    def status(self, now=None):
+        now = now or time.time()
+        with self.lock:
+            calls = len(self.outcomes)
+            failures = self.outcomes.count(False)
+            status = {
+                'state': self.state,
+                'failure_rate': round(failures / calls, 3) if calls else 0.0,
+                'recent_calls': calls,
+                'opened': self.counters['opened'],
+                'rejected': self.counters['rejected']
+            }
+            if self.state == OPEN:
+                status['retry_in_seconds'] = round(max(0, self.opened_at + self.open_seconds - now), 1)
+        return status
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def get_breaker(name, **kwargs):
+    """Return the shared breaker for a provider, creating it on first use"""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name, **kwargs)
+            _breakers[name] = breaker
+        return breaker
+
+def breaker_states():
+    """State of every provider breaker"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.status() for breaker in breakers}
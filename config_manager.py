@@ -1,5 +1,8 @@
 from azure.appconfiguration import AzureAppConfigurationClient
 from azure.identity import DefaultAzureCredential
+from azure.core import MatchConditions
+from datetime import datetime
+import threading
 import json
 import os
 import logging
@@ -18,7 +21,14 @@ DEFAULT_CONFIG = {
 class ConfigManager:
     def __init__(self):
         self.connection_string = os.getenv('AZURE_APP_CONFIG_CONNECTION_STRING')
+        self.refresh_interval = int(os.getenv('CONFIG_REFRESH_SECONDS', '60'))
         self.client = None
+        self.lock = threading.Lock()
+        self.stock_config = None
+        self.etag = None
+        self.last_checked = None
+        self.last_changed = None
+        self.last_error = None
         self.init_client()
 
     def init_client(self):
@@ -40,21 +50,78 @@ class ConfigManager:
             logger.warning("Will use default configuration")
 
     def get_stock_config(self):
-        try:
-            if not self.client:
+        """Return the cached stock configuration, fetching it on first use"""
+        with self.lock:
+            if self.stock_config is not None:
+                return self.stock_config
+        self.refresh_stock_config()
+        with self.lock:
+            return self.stock_config if self.stock_config is not None else DEFAULT_CONFIG
+
+    def refresh_stock_config(self):
+        """Re-check the stock setting with a conditional request.
+
+        Only a changed setting (new etag) is downloaded and parsed. Returns True
+        when the cached configuration was replaced.
+        """
+        with self.lock:
+            etag = self.etag
+            have_config = self.stock_config is not None
+            self.last_checked = datetime.now()
+
+        if not self.client:
+            if not have_config:
                 logger.warning("Using default configuration as no Azure App Configuration client is available")
-                return DEFAULT_CONFIG
-            
-            # Get the stock configuration from Azure App Configuration
-            logger.info("Fetching configuration from Azure App Configuration")
-            setting = self.client.get_configuration_setting(key="stocks")
+                return self._store(DEFAULT_CONFIG, None)
+            return False
+
+        try:
+            logger.info("Checking Azure App Configuration for stock configuration changes")
+            if etag:
+                setting = self.client.get_configuration_setting(
+                    key="stocks", etag=etag, match_condition=MatchConditions.IfModified)
+                if setting is None:
+                    # 304: unchanged since the etag we hold
+                    return False
+            else:
+                setting = self.client.get_configuration_setting(key="stocks")
+
             if setting:
                 logger.info("Successfully retrieved configuration from Azure App Configuration")
-                return json.loads(setting.value)
-            else:
-                logger.warning("Stock configuration not found in Azure App Configuration, using default")
-                return DEFAULT_CONFIG
+                return self._store(json.loads(setting.value), setting.etag)
+            logger.warning("Stock configuration not found in Azure App Configuration, using default")
+            return self._store(DEFAULT_CONFIG, None)
         except Exception as e:
             logger.error(f"Error getting stock configuration: {str(e)}")
-            logger.warning("Falling back to default configuration")
-            return DEFAULT_CONFIG 
\ No newline at end of file
+            with self.lock:
+                self.last_error = str(e)
+            if not have_config:
+                logger.warning("Falling back to default configuration")
+                return self._store(DEFAULT_CONFIG, None)
+            logger.warning("Keeping the previously loaded configuration")
+            return False
+
+    def _store(self, config, etag):
+        with self.lock:
+            changed = config != self.stock_config
+            self.stock_config = config
+            self.etag = etag
+            self.last_error = None
+            if changed:
+                self.last_changed = datetime.now()
+        if changed:
+            logger.info("Stock configuration changed")
+        return changed
+
+    def status(self):
+        """Cached configuration state for health reporting"""
+        with self.lock:
+            return {
+                'client': bool(self.client),
+                'loaded': self.stock_config is not None,
+                'etag': self.etag,
+                'refresh_interval_seconds': self.refresh_interval,
+                'last_checked': self.last_checked.isoformat() if self.last_checked else None,
+                'last_changed': self.last_changed.isoformat() if self.last_changed else None,
+                'last_error': self.last_error
+            }
@@ -0,0 +1,214 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import logging
+
+try:
+    import fcntl
+except ImportError:  # Windows (wfastcgi) has no fcntl
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+class LeaderLock:
+    """Process-wide leadership held through an exclusive lock on a shared file.
+
+    The OS releases the lock when the holding process exits, so a follower that
+    retries try_acquire() takes over automatically.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.handle = None
+        self.lock = threading.Lock()
+
+    @property
+    def is_leader(self):
+        return self.handle is not None
+
+    def try_acquire(self):
+        """Attempt to become leader without blocking"""
+        with self.lock:
+            if self.handle is not None:
+                return True
+            handle = open(self.path, 'a+')
+            try:
+                if fcntl is not None:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    handle.seek(0)
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+            except OSError:
+                handle.close()
+                return False
+            handle.seek(0)
+            handle.truncate()
+            handle.write(str(os.getpid()))
+            handle.flush()
+            self.handle = handle
+            logger.info(f"Process {os.getpid()} acquired scheduler leadership ({self.path})")
+            return True
+
+    def release(self):
+        with self.lock:
+            if self.handle is None:
+                return
+            try:
+                if fcntl is not None:
+                    fcntl.flock(self.handle.fileno(), fcntl.LOCK_UN)
+                else:
+                    self.handle.seek(0)
+                    msvcrt.locking(self.handle.fileno(), msvcrt.LK_UNLCK, 1)
+            finally:
+                self.handle.close()
+                self.handle = None
+
+class SharedStateStore:
+    """SQLite snapshot of the cache sections shared between worker processes"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS sections ('
+                'name TEXT PRIMARY KEY, generation INTEGER NOT NULL, '
+                'payload TEXT NOT NULL, updated REAL NOT NULL)'
+            )
+            self.conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+            # Leader-produced values that aren't cache sections (e.g. health probe results)
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS state ('
+                'name TEXT PRIMARY KEY, payload TEXT NOT NULL, updated REAL NOT NULL)'
+            )
+            # Refreshes requested on followers, run by the leader
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS refresh_requests ('
+                'id TEXT PRIMARY KEY, providers TEXT NOT NULL, created REAL NOT NULL, '
+                'claimed INTEGER NOT NULL DEFAULT 0, status TEXT)'
+            )
+            # The epoch is shared by every worker so their ETags agree
+            self.conn.execute('INSERT OR IGNORE INTO meta (key, value) VALUES (?, ?)',
+                              ('epoch', format(int(time.time()), 'x')))
+
+    def epoch(self):
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'epoch'").fetchone()
+        return row[0]
+
+    def max_generation(self):
+        with self.lock:
+            row = self.conn.execute('SELECT MAX(generation) FROM sections').fetchone()
+        return row[0] or 0
+
+    def write(self, name, value, generation, updated=None):
+        """Publish one section; readers only ever see whole rows"""
+        payload = json.dumps(value, default=str)
+        with self.lock, self.conn:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO sections (name, generation, payload, updated) VALUES (?, ?, ?, ?)',
+                (name, generation, payload, updated if updated is not None else time.time())
+            )
+
+    def put(self, name, value):
+        """Store a value outside the generation sequence"""
+        payload = json.dumps(value, default=str)
+        with self.lock, self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO state (name, payload, updated) VALUES (?, ?, ?)',
+                              (name, payload, time.time()))
+
+    def get(self, name):
+        """Return a value stored with put(), or None"""
+        with self.lock:
+            row = self.conn.execute('SELECT payload FROM state WHERE name = ?', (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def enqueue_request(self, request_id, providers, max_age=3600):
+        """Queue a refresh for the leader; requests older than max_age are dropped"""
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM refresh_requests WHERE created < ?', (now - max_age,))
+            self.conn.execute('INSERT INTO refresh_requests (id, providers, created) VALUES (?, ?, ?)',
+                              (request_id, json.dumps(providers), now))
+
+    def claim_requests(self):
+        """Return (id, providers) for every unclaimed request and mark them claimed"""
+        with self.lock, self.conn:
+            rows = self.conn.execute(
+                'SELECT id, providers FROM refresh_requests WHERE claimed = 0 ORDER BY created'
+            ).fetchall()
+            self.conn.executemany('UPDATE refresh_requests SET claimed = 1 WHERE id = ?',
+                                  [(request_id,) for request_id, _ in rows])
+        return [(request_id, json.loads(providers)) for request_id, providers in rows]
+
+    def update_request(self, request_id, status):
+        """Record the leader's progress report for a request"""
+        with self.lock, self.conn:
+            self.conn.execute('UPDATE refresh_requests SET status = ? WHERE id = ?',
+                              (json.dumps(status, default=str), request_id))
+
+    def get_request(self, request_id):
+        """Return {'providers', 'created', 'status'} for a request, or None"""
+        with self.lock:
+            row = self.conn.execute('SELECT providers, created, status FROM refresh_requests WHERE id = ?',
+                                    (request_id,)).fetchone()
+        if row is None:
+            return None
+        return {'providers': json.loads(row[0]), 'created': row[1], 'status': json.loads(row[2]) if row[2] else None}
+
+    def read_since(self, generation):
+        """Return (name, generation, value, updated) for sections newer than generation"""
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT name, generation, payload, updated FROM sections WHERE generation > ? ORDER BY generation',
+                (generation,)
+            ).fetchall()
+        return [(name, gen, json.loads(payload), updated) for name, gen, payload, updated in rows]
+
+class SQLiteRateLimitBackend:
+    """Sliding-window rate limit counters shared by every worker through SQLite"""
+
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS rate_limits ('
+            'key TEXT PRIMARY KEY, window INTEGER NOT NULL, '
+            'current INTEGER NOT NULL, previous INTEGER NOT NULL)'
+        )
+        self.swept = None
+
+    def acquire(self, key, now, limit, window_seconds):
+        """Check and count one request for key atomically across processes"""
+        from middleware import sliding_window_acquire
+
+        window = int(now // window_seconds)
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                if self.swept != window:
+                    # Lazy expiry of idle keys, once per window
+                    self.conn.execute('DELETE FROM rate_limits WHERE window < ?', (window - 1,))
+                    self.swept = window
+                row = self.conn.execute(
+                    'SELECT window, current, previous FROM rate_limits WHERE key = ?', (key,)
+                ).fetchone()
+                state = list(row) if row else [window, 0, 0]
+                allowed = sliding_window_acquire(state, now, limit, window_seconds)
+                if allowed or row is None or state[0] != row[0]:
+                    self.conn.execute(
+                        'INSERT OR REPLACE INTO rate_limits (key, window, current, previous) VALUES (?, ?, ?, ?)',
+                        (key, state[0], state[1], state[2])
+                    )
+                self.conn.execute('COMMIT')
+                return allowed
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
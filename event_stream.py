@@ -0,0 +1,95 @@
+from collections import OrderedDict
+import json
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+def format_sse(data, event=None, event_id=None):
+    """Serialize one Server-Sent Events message"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    payload = data if isinstance(data, str) else json.dumps(data, default=str)
+    for line in payload.splitlines() or ['']:
+        lines.append(f"data: {line}")
+    return '\n'.join(lines) + '\n\n'
+
+class Subscriber:
+    """Pending messages for one connected client.
+
+    Messages are coalesced by key, so a slow consumer only ever holds the
+    latest message per key instead of an unbounded backlog.
+    """
+
+    def __init__(self):
+        self.pending = OrderedDict()
+        self.condition = threading.Condition()
+        self.closed = False
+        self.coalesced = 0
+
+    def offer(self, key, message):
+        with self.condition:
+            if key in self.pending:
+                del self.pending[key]
+                self.coalesced += 1
+            self.pending[key] = message
+            self.condition.notify()
+
+    def next_messages(self, timeout):
+        """Wait up to timeout seconds and return every pending message"""
+        with self.condition:
+            if not self.pending and not self.closed:
+                self.condition.wait(timeout)
+            messages = list(self.pending.values())
+            self.pending.clear()
+            return messages
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+
+class Broadcaster:
+    """Fan out messages from one publisher to every connected subscriber"""
+
+    def __init__(self, max_subscribers=500):
+        self.max_subscribers = max_subscribers
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.published = 0
+
+    def subscribe(self):
+        """Register a new subscriber, or return None when at capacity"""
+        with self.lock:
+            if len(self.subscribers) >= self.max_subscribers:
+                logger.warning("Event stream subscriber limit reached")
+                return None
+            subscriber = Subscriber()
+            self.subscribers.add(subscriber)
+            return subscriber
+
+    def unsubscribe(self, subscriber):
+        subscriber.close()
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def publish(self, key, message):
+        """Queue an already-formatted message for every subscriber"""
+        with self.lock:
+            subscribers = list(self.subscribers)
+            self.published += 1
+        for subscriber in subscribers:
+            subscriber.offer(key, message)
+
+    def stats(self):
+        with self.lock:
+            subscribers = list(self.subscribers)
+            published = self.published
+        return {
+            'subscribers': len(subscribers),
+            'published': published,
+            'coalesced': sum(subscriber.coalesced for subscriber in subscribers)
+        }
@@ -0,0 +1,99 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Token bucket rate limiter for upstream API quotas. Any 60-second span can
+# admit up to burst + rate_per_minute calls, so it suits soft limits; use
+# SlidingWindowLimiter for hard per-minute quotas.
+class TokenBucket:
+    def __init__(self, rate_per_minute=60, burst=None):
+        self.rate = rate_per_minute / 60.0  # tokens per second
+        self.capacity = float(burst if burst is not None else max(1, rate_per_minute // 2))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def acquire(self, timeout=None):
+        """Block until a token is available, then consume it; False if that takes longer than timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+class SlidingWindowLimiter:
+    """At most calls_per_minute acquisitions in any 60-second span, for hard per-minute quotas"""
+
+    def __init__(self, calls_per_minute=60, period=60.0):
+        self.calls = calls_per_minute
+        self.period = period
+        self.times = deque()  # monotonic times of the acquisitions inside the current span
+        self.lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        """Block until a call fits in the window, then record it; False if that takes longer than timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                while self.times and now - self.times[0] >= self.period:
+                    self.times.popleft()
+                if len(self.times) < self.calls:
+                    self.times.append(now)
+                    return True
+                wait = self.period - (now - self.times[0])
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+def fetch_concurrently(func, items, max_workers=8, limiter=None, executor=None):
+    """Run func(item) for every item on a bounded thread pool.
+
+    Returns a dict mapping each item to its result. If a limiter is given,
+    a token is acquired before each call. Exceptions raised by func are
+    logged and stored as None. Pass a long-lived executor to keep its threads
+    (and their thread-local clients) between calls; max_workers is then ignored.
+    """
+    items = list(items)
+    if not items:
+        return {}
+
+    def call(item):
+        if limiter is not None:
+            limiter.acquire()
+        return func(item)
+
+    if executor is not None:
+        return _collect(executor, call, items)
+    workers = max(1, min(max_workers, len(items)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return _collect(executor, call, items)
+
+def _collect(executor, call, items):
+    results = {}
+    futures = {executor.submit(call, item): item for item in items}
+    for future in as_completed(futures):
+        item = futures[future]
+        try:
+            results[item] = future.result()
+        except Exception as e:
+            logger.error(f"Error fetching {item}: {str(e)}")
+            results[item] = None
+    return results
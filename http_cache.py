@@ -0,0 +1,252 @@
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+def parse_cache_control(value):
+    """Cache-Control header as {directive: value or True}"""
+    directives = {}
+    for part in (value or '').split(','):
+        name, _, arg = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = arg.strip('"') if arg else True
+    return directives
+
+def freshness_lifetime(headers, now=None):
+    """Seconds a response may be reused without revalidation (0 = always revalidate)"""
+    now = now or time.time()
+    directives = parse_cache_control(headers.get('Cache-Control'))
+    if 'no-cache' in directives:
+        return 0
+    try:
+        age = int(headers.get('Age') or 0)
+    except ValueError:
+        age = 0
+    if 'max-age' in directives:
+        try:
+            return max(0, int(directives['max-age']) - age)
+        except ValueError:
+            return 0
+    if headers.get('Expires'):
+        try:
+            return max(0, parsedate_to_datetime(headers['Expires']).timestamp() - now)
+        except (TypeError, ValueError):
+            return 0
+    return 0
+
+class CacheRecord:
+    """One cached 200 response: body, validators and values derived from it"""
+
+    def __init__(self, body, etag=None, last_modified=None, expires_at=0, content_type=None, body_hash=None):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+        self.content_type = content_type
+        self.body_hash = body_hash or hashlib.sha256(body).hexdigest()
+        self.derived = {}  # parsed JSON and normalized values, valid for this body_hash
+
+    def meta(self):
+        return {'etag': self.etag, 'last_modified': self.last_modified, 'expires_at': self.expires_at,
+                'content_type': self.content_type, 'body_hash': self.body_hash}
+
+class CachedResponse:
+    """A 200 response served through the HTTP cache.
+
+    json() parses the body at most once per distinct body, and memo() lets a
+    fetcher reuse its normalized result until the upstream body changes.
+    """
+
+    status_code = 200
+
+    def __init__(self, record, source):
+        self.record = record
+        self.source = source  # 'fresh', 'revalidated', 'unchanged' or 'network'
+        self.content = record.body
+        self.headers = {'Content-Type': record.content_type} if record.content_type else {}
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+    @property
+    def body_hash(self):
+        return self.record.body_hash
+
+    def memo(self, key, func):
+        """Return func(parsed body), computed once per distinct body"""
+        if key not in self.record.derived:
+            self.record.derived[key] = func(self.json())
+        return self.record.derived[key]
+
+    def json(self):
+        if 'json' not in self.record.derived:
+            self.record.derived['json'] = json.loads(self.content)
+        return self.record.derived['json']
+
+class HTTPCache:
+    """Size-bounded LRU of upstream responses, optionally mirrored to disk.
+
+    Responses are reused while Cache-Control/Expires says they are fresh and
+    revalidated with If-None-Match / If-Modified-Since afterwards. When a full
+    200 comes back with the same body hash, the previously parsed and
+    normalized values are kept.
+    """
+
+    def __init__(self, max_bytes=8 * 1024 * 1024, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.lock = threading.Lock()
+        self.records = OrderedDict()  # key -> CacheRecord, least recently used first
+        self.size = 0
+        self.counters = {'fresh': 0, 'revalidated': 0, 'unchanged': 0, 'changed': 0, 'evicted': 0}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._trim_disk()
+
+    @staticmethod
+    def make_key(url, params=None):
+        if params:
+            url = url + '?' + '&'.join(f'{k}={v}' for k, v in sorted(params.items()))
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def _trim_disk(self):
+        """Drop the oldest files left by earlier runs beyond max_bytes"""
+        try:
+            files = [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                     if name.endswith('.body')]
+            files.sort(key=os.path.getmtime, reverse=True)
+            total = 0
+            for path in files:
+                total += os.path.getsize(path)
+                if total > self.max_bytes:
+                    self._remove_files(path[:-len('.body')])
+        except OSError as e:
+            logger.error(f"Error trimming HTTP cache directory: {str(e)}")
+
+    def _remove_files(self, base):
+        for suffix in ('.body', '.meta'):
+            try:
+                os.unlink(base + suffix)
+            except OSError:
+                pass
+
+    def _load_from_disk(self, key):
+        try:
+            with open(self._path(key) + '.meta', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(self._path(key) + '.body', 'rb') as f:
+                body = f.read()
+            return CacheRecord(body, **meta)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Ignoring unreadable HTTP cache entry: {str(e)}")
+            return None
+
+    def _save_to_disk(self, key, record):
+        try:
+            for suffix, data, mode in (('.body', record.body, 'wb'),
+                                       ('.meta', json.dumps(record.meta()).encode('utf-8'), 'wb')):
+                handle = tempfile.NamedTemporaryFile(mode, dir=self.directory, delete=False)
+                with handle:
+                    handle.write(data)
+                os.replace(handle.name, self._path(key) + suffix)
+        except Exception as e:
+            logger.error(f"Error writing HTTP cache entry: {str(e)}")
+
+    def get(self, key):
+        with self.lock:
+            record = self.records.get(key)
+            if record is not None:
+                self.records.move_to_end(key)
+                return record
+        if self.directory:
+            record = self._load_from_disk(key)
+            if record is not None:
+                self._put(key, record, persist=False)
+        return record
+
+    def _put(self, key, record, persist=True):
+        size = len(record.body)
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            previous = self.records.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous.body)
+            self.records[key] = record
+            self.size += size
+            evicted = []
+            while self.size > self.max_bytes:
+                old_key, old = self.records.popitem(last=False)
+                self.size -= len(old.body)
+                self.counters['evicted'] += 1
+                evicted.append(old_key)
+        if self.directory:
+            for old_key in evicted:
+                self._remove_files(self._path(old_key))
+            if persist:
+                self._save_to_disk(key, record)
+
+    def conditional_headers(self, record):
+        headers = {}
+        if record is not None:
+            if record.etag:
+                headers['If-None-Match'] = record.etag
+            if record.last_modified:
+                headers['If-Modified-Since'] = record.last_modified
+        return headers
+
+    def count(self, outcome):
+        with self.lock:
+            self.counters[outcome] += 1
+
+    def store(self, key, previous, response, now=None):
+        """Record a 200 or 304 and return (record, source); None if it can't be cached"""
+        now = now or time.time()
+        headers = response.headers
+        directives = parse_cache_control(headers.get('Cache-Control'))
+        expires_at = now + freshness_lifetime(headers, now)
+
+        if response.status_code == 304 and previous is not None:
+            previous.expires_at = expires_at
+            previous.etag = headers.get('ETag') or previous.etag
+            previous.last_modified = headers.get('Last-Modified') or previous.last_modified
+            if self.directory:
+                self._save_to_disk(key, previous)
+            self.count('revalidated')
+            return previous, 'revalidated'
+
+        if 'no-store' in directives:
+            return None, None
+
+        body = response.content
+        body_hash = hashlib.sha256(body).hexdigest()
+        if previous is not None and previous.body_hash == body_hash:
+            # Same bytes as before: keep the parsed and normalized values
+            record = previous
+            source = 'unchanged'
+        else:
+            record = CacheRecord(body, body_hash=body_hash, content_type=headers.get('Content-Type'))
+            source = 'network'
+        record.etag = headers.get('ETag')
+        record.last_modified = headers.get('Last-Modified')
+        record.expires_at = expires_at
+        self._put(key, record)
+        self.count('unchanged' if source == 'unchanged' else 'changed')
+        return record, source
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters, entries=len(self.records), bytes=self.size, max_bytes=self.max_bytes)
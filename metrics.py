@@ -0,0 +1,126 @@
+from functools import wraps
+import threading
+import time
+
+# Latency buckets in seconds, from sub-millisecond page hits to slow upstream calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1, 2.5, 5, 10, 30, 60)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+class Histogram:
+    """Fixed-bucket histogram for one label set"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def state(self):
+        with self.lock:
+            return list(self.counts), self.sum, self.count
+
+    def quantile(self, q):
+        """Estimate a quantile by linear interpolation inside the matching bucket"""
+        counts, _, count = self.state()
+        if count == 0:
+            return None
+        rank = q * count
+        cumulative = 0
+        lower = 0.0
+        for i, bucket_count in enumerate(counts):
+            upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+            if cumulative + bucket_count >= rank and bucket_count:
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+            lower = upper
+        return self.buckets[-1]
+
+class MetricsRegistry:
+    """In-process histograms keyed by metric name and label set"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}  # name -> (help, {labels: Histogram})
+
+    def observe(self, name, value, help_text='', **labels):
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            _, series = self.metrics.setdefault(name, (help_text, {}))
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+        histogram.observe(value)
+
+    def _items(self):
+        with self.lock:
+            return [(name, help_text, list(series.items()))
+                    for name, (help_text, series) in sorted(self.metrics.items())]
+
+    def render_prometheus(self):
+        """Render every histogram in the Prometheus text exposition format"""
+        lines = []
+        for name, help_text, series in self._items():
+            if help_text:
+                lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} histogram')
+            for labels, histogram in series:
+                counts, total, count = histogram.state()
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.buckets + ('+Inf',), counts):
+                    cumulative += bucket_count
+                    bucket_labels = _format_labels(labels + (('le', bound),))
+                    lines.append(f'{name}_bucket{bucket_labels} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {total}')
+                lines.append(f'{name}_count{_format_labels(labels)} {count}')
+        return '\n'.join(lines) + '\n'
+
+    def summary(self):
+        """Count, mean and p50/p95/p99 estimates per series, for quick inspection"""
+        result = {}
+        for name, _, series in self._items():
+            for labels, histogram in series:
+                _, total, count = histogram.state()
+                result.setdefault(name, []).append({
+                    'labels': dict(labels),
+                    'count': count,
+                    'mean': total / count if count else None,
+                    'p50': histogram.quantile(0.5),
+                    'p95': histogram.quantile(0.95),
+                    'p99': histogram.quantile(0.99)
+                })
+        return result
+
+registry = MetricsRegistry()
+
+def timed(name, help_text='', **labels):
+    """Decorator recording each call's duration in a histogram"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            start_time = time.perf_counter()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                registry.observe(name, time.perf_counter() - start_time, help_text, **labels)
+        return decorated_function
+    return decorator
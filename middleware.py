@@ -1,9 +1,11 @@
 from functools import wraps
 from flask import request, Response, make_response, redirect
 import time
-from datetime import datetime, timedelta
 import threading
+import tempfile
 import logging
+import os
+from metrics import registry as metrics
 
 logger = logging.getLogger(__name__)
 
@@ -18,36 +20,76 @@ def https_redirect(f):
     return decorated_function
 
 # Rate limiting
+def sliding_window_acquire(state, now, limit, window_seconds):
+    """Sliding-window counter check on a fixed-size [window, current, previous] state.
+
+    The previous window's count is weighted by how much of it still overlaps
+    the sliding window, so memory stays O(1) per key regardless of traffic.
+    Returns True (and counts the request) if it is allowed.
+    """
+    window = int(now // window_seconds)
+    if state[0] != window:
+        state[2] = state[1] if state[0] == window - 1 else 0
+        state[1] = 0
+        state[0] = window
+    elapsed = (now % window_seconds) / window_seconds
+    if state[2] * (1 - elapsed) + state[1] >= limit:
+        return False
+    state[1] += 1
+    return True
+
 class RateLimiter:
-    def __init__(self, requests_per_minute=60):
+    def __init__(self, requests_per_minute=60, shards=16, backend=None):
         self.requests_per_minute = requests_per_minute
-        self.requests = {}
-        self.lock = threading.Lock()
-
-    def is_allowed(self, ip):
-        now = datetime.now()
-        with self.lock:
-            # Clean old entries
-            self.requests = {k: v for k, v in self.requests.items() 
-                           if v[-1] > now - timedelta(minutes=1)}
-            
-            # Check current IP
-            if ip not in self.requests:
-                self.requests[ip] = []
-            
-            # Remove old requests for this IP
-            self.requests[ip] = [t for t in self.requests[ip] 
-                               if t > now - timedelta(minutes=1)]
-            
-            # Check rate limit
-            if len(self.requests[ip]) >= self.requests_per_minute:
-                return False
-            
-            # Add new request
-            self.requests[ip].append(now)
-            return True
-
-rate_limiter = RateLimiter()
+        self.window_seconds = 60
+        self.backend = backend
+        # Keys are spread over independently locked shards so request threads
+        # only contend when they hash to the same shard
+        self.shards = [{} for _ in range(shards)]
+        self.locks = [threading.Lock() for _ in range(shards)]
+        self.swept = [0] * shards
+
+    def _sweep(self, shard, window):
+        """Drop keys idle for two full windows; runs at most once per window per shard"""
+        stale = [key for key, state in shard.items() if state[0] < window - 1]
+        for key in stale:
+            del shard[key]
+
+    def is_allowed(self, ip, now=None):
+        now = now or time.time()
+        if self.backend is not None:
+            try:
+                return self.backend.acquire(ip, now, self.requests_per_minute, self.window_seconds)
+            except Exception as e:
+                logger.error(f"Shared rate limit backend failed, using local limits: {str(e)}")
+
+        index = hash(ip) % len(self.shards)
+        shard = self.shards[index]
+        window = int(now // self.window_seconds)
+        with self.locks[index]:
+            if self.swept[index] != window:
+                self._sweep(shard, window)
+                self.swept[index] = window
+            state = shard.get(ip)
+            if state is None:
+                state = shard[ip] = [window, 0, 0]
+            return sliding_window_acquire(state, now, self.requests_per_minute, self.window_seconds)
+
+def create_rate_limiter():
+    """Build the app-wide limiter, optionally shared across worker processes"""
+    requests_per_minute = int(os.getenv('RATE_LIMIT_PER_MINUTE', '60'))
+    backend = None
+    if os.getenv('RATE_LIMIT_BACKEND', 'local').lower() == 'sqlite':
+        try:
+            from coordination import SQLiteRateLimitBackend
+            directory = os.getenv('SHARED_STATE_DIR', os.path.join(tempfile.gettempdir(), 'adydash'))
+            os.makedirs(directory, exist_ok=True)
+            backend = SQLiteRateLimitBackend(os.path.join(directory, 'ratelimit.sqlite3'))
+        except Exception as e:
+            logger.error(f"Could not open shared rate limit backend, using local limits: {str(e)}")
+    return RateLimiter(requests_per_minute=requests_per_minute, backend=backend)
+
+rate_limiter = create_rate_limiter()
 
 def rate_limit(f):
     @wraps(f)
@@ -81,6 +123,43 @@ def cache_control(max_age=300):
         return decorated_function
     return decorator
 
+# Conditional GET (ETag / Last-Modified)
+def conditional_get(get_validators):
+    """Answer 304 Not Modified when the client already has the current version.
+
+    get_validators() is called with the view's arguments and returns an
+    (etag, last_modified) tuple; either may be None.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            etag, last_modified = get_validators(*args, **kwargs)
+            if last_modified is not None:
+                last_modified = last_modified.replace(microsecond=0)
+
+            not_modified = False
+            if etag and request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            elif last_modified is not None and request.if_modified_since:
+                not_modified = last_modified <= request.if_modified_since
+
+            if not_modified:
+                response = make_response('', 304)
+            else:
+                response = f(*args, **kwargs)
+                if not isinstance(response, Response):
+                    response = make_response(response)
+                if response.status_code != 200:
+                    return response
+
+            if etag:
+                response.set_etag(etag, weak=True)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            return response
+        return decorated_function
+    return decorator
+
 # Request validation
 def validate_request(f):
     @wraps(f)
@@ -101,16 +180,22 @@ def validate_request(f):
 def performance_monitor(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        start_time = time.time()
+        start_time = time.perf_counter()
         response = f(*args, **kwargs)
-        duration = time.time() - start_time
+        duration = time.perf_counter() - start_time
         
         # Log request duration
-        logger.info(f"Request to {request.path} took {duration:.2f} seconds")
+        logger.info(f"Request to {request.path} took {duration:.4f} seconds")
         
         # Add timing header
         if not isinstance(response, Response):
             response = make_response(response)
-        response.headers['X-Response-Time'] = f"{duration:.2f}s"
+        response.headers['X-Response-Time'] = f"{duration:.4f}s"
+
+        # Record per route template (not raw path) to keep label cardinality bounded
+        route = request.url_rule.rule if request.url_rule else request.path
+        metrics.observe('http_request_duration_seconds', duration,
+                        'Time spent handling HTTP requests',
+                        route=route, method=request.method, status=response.status_code)
         return response
     return decorated_function 
\ No newline at end of file
@@ -0,0 +1,115 @@
+from datetime import datetime
+from fetch_engine import fetch_concurrently
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NEWS_FEEDS = 'business|Business News,politics|Political News'
+
+def parse_news_feeds(spec):
+    """Parse NEWS_FEEDS, e.g. "business|Business News,sources=bbc-news|BBC News".
+
+    Each entry is a NewsAPI category or a param=value query (sources, q, ...),
+    optionally followed by |Title. Returns a list of {key, title, params}.
+    """
+    feeds = []
+    for entry in (spec or '').split(','):
+        query, _, title = entry.strip().partition('|')
+        query = query.strip()
+        if not query:
+            continue
+        if '=' in query:
+            param, _, value = query.partition('=')
+            key, params = value.strip(), {param.strip(): value.strip()}
+        else:
+            key, params = query, {'category': query, 'country': 'us'}
+        feeds.append({'key': key, 'title': title.strip() or f"{key.replace('-', ' ').title()} News", 'params': params})
+    return feeds
+
+def format_published(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ').strftime('%H:%M %d/%m') if value else ''
+    except ValueError:
+        return ''
+
+def normalize_articles(articles):
+    """Lazily turn raw NewsAPI articles into the dashboard's article dicts"""
+    for article in articles:
+        url = article.get('url') or ''
+        if not url or not article.get('title'):
+            continue
+        yield {
+            'title': article.get('title', ''),
+            'description': article.get('description', ''),
+            'url': url,
+            'source': (article.get('source') or {}).get('name', ''),
+            'published_at': format_published(article.get('publishedAt'))
+        }
+
+class NewsPipeline:
+    """Fetches every configured news feed concurrently and merges them.
+
+    Feeds share one rate limiter, go through a single normalizer, and an
+    article that appears in several feeds is only shown under the first one
+    in configuration order.
+    """
+
+    def __init__(self, client, api_key, feeds, base_url='https://newsapi.org/v2',
+                 articles_per_feed=5, limiter=None, max_workers=4):
+        self.client = client
+        self.api_key = api_key
+        self.feeds = feeds
+        self.base_url = base_url.rstrip('/')
+        self.articles_per_feed = articles_per_feed
+        self.limiter = limiter
+        self.max_workers = max_workers
+
+    def fetch_feed(self, key):
+        """Normalized articles for one feed, or None if the request failed"""
+        feed = next(feed for feed in self.feeds if feed['key'] == key)
+        # Over-fetch a little so articles dropped as duplicates can be replaced
+        params = dict(feed['params'], pageSize=self.articles_per_feed * 2, apiKey=self.api_key)
+        response = self.client.get_cached(f"{self.base_url}/top-headlines", params=params)
+        if response.status_code != 200:
+            logger.error(f"{feed['title']} API HTTP error: {response.status_code}")
+            return None
+        data = response.json()
+        if data.get('status') != 'ok':
+            logger.error(f"{feed['title']} API error: {data.get('message', 'unknown error')}")
+            return None
+        if hasattr(response, 'memo'):
+            # Cached response: reuse the normalized list until the body changes
+            return response.memo('articles', lambda data: list(normalize_articles(data.get('articles', []))))
+        return list(normalize_articles(data.get('articles', [])))
+
+    def build_sections(self, articles_by_feed, feeds):
+        """Sections for a list of feeds, each article shown once under its first feed"""
+        seen_urls = set()
+        sections = []
+        for feed in feeds:
+            articles = []
+            for article in articles_by_feed.get(feed['key']) or []:
+                if article['url'] in seen_urls:
+                    continue
+                seen_urls.add(article['url'])
+                articles.append(article)
+                if len(articles) >= self.articles_per_feed:
+                    break
+            sections.append({'key': feed['key'], 'title': feed['title'], 'articles': articles})
+        return sections
+
+    def collect(self, feeds=None):
+        """Fetch every feed once; returns {'sections', 'feeds'} or None if nothing came back.
+
+        'sections' is built for `feeds` (default: all of them) and 'feeds' keeps
+        each feed's articles so other views can build their own sections.
+        """
+        results = fetch_concurrently(self.fetch_feed, [feed['key'] for feed in self.feeds],
+                                     max_workers=self.max_workers, limiter=self.limiter)
+        articles_by_feed = {key: articles for key, articles in results.items() if articles}
+        if not articles_by_feed:
+            return None
+        sections = self.build_sections(articles_by_feed, feeds or self.feeds)
+        for section in sections:
+            logger.info(f"Fetched {len(section['articles'])} {section['title']} articles")
+        return {'sections': sections, 'feeds': articles_by_feed}
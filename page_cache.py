@@ -0,0 +1,61 @@
+import gzip
+import threading
+import logging
+
+try:
+    import brotli
+except ImportError:  # brotli ships with Flask-Compress, but don't require it
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+class RenderedPage:
+    """A rendered page body with its pre-compressed variants"""
+
+    def __init__(self, version, body, modified=None):
+        self.version = version
+        self.modified = modified
+        self.encodings = {'identity': body}
+        self.encodings['gzip'] = gzip.compress(body, compresslevel=6)
+        if brotli is not None:
+            self.encodings['br'] = brotli.compress(body, quality=5)
+
+    def select(self, accept_encoding):
+        """Pick the smallest encoding the client accepts"""
+        accepted = {part.split(';')[0].strip().lower() for part in (accept_encoding or '').split(',')}
+        for encoding in ('br', 'gzip'):
+            if encoding in accepted and encoding in self.encodings:
+                return encoding, self.encodings[encoding]
+        return 'identity', self.encodings['identity']
+
+class PageCache:
+    """Versioned store of pre-rendered pages, replaced whenever the data changes"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pages = {}
+        self.version = 0
+
+    def store(self, name, html, version=None, modified=None):
+        """Compress and store a freshly rendered page, returning its version"""
+        body = html.encode('utf-8') if isinstance(html, str) else html
+        with self.lock:
+            if version is None:
+                self.version += 1
+                version = self.version
+            else:
+                self.version = max(self.version, version)
+        page = RenderedPage(version, body, modified)
+        with self.lock:
+            current = self.pages.get(name)
+            # A slower render must not overwrite a newer one
+            if current is None or current.version < page.version:
+                self.pages[name] = page
+        logger.info(f"Stored pre-rendered page '{name}' version {version} ({len(body)} bytes)")
+        return version
+
+    def get(self, name):
+        with self.lock:
+            return self.pages.get(name)
+
+page_cache = PageCache()
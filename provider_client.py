@@ -0,0 +1,192 @@
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
+import requests
+import random
+import threading
+import time
+import logging
+from metrics import registry as metrics
+from circuit_breaker import CircuitOpenError
+from http_cache import CachedResponse
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying: rate limited or transient upstream failures
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class QuotaTimeoutError(Exception):
+    """Raised when no quota slot frees up within the caller's quota_wait"""
+
+def parse_retry_after(value):
+    """Retry-After header (seconds or an HTTP date) as seconds to wait, or None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class ProviderClient:
+    """Pooled keep-alive HTTP client for a single upstream provider.
+
+    With a limiter, every attempt (retries included) takes a slot, so retries
+    can't push the provider past its quota. Time spent waiting for a slot is
+    not call latency: the breaker only sees time spent talking to the provider.
+    """
+
+    def __init__(self, name, pool_maxsize=10, connect_timeout=3.05, read_timeout=10,
+                 retries=2, backoff=0.5, breaker=None, http_cache=None, limiter=None, max_retry_after=30):
+        self.name = name
+        self.breaker = breaker
+        self.http_cache = http_cache
+        self.limiter = limiter
+        self.max_retry_after = max_retry_after
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, pool_block=True)
+        self.session = requests.Session()
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+        self.lock = threading.Lock()
+        self.counters = {'requests': 0, 'retries': 0, 'errors': 0}
+
+    def _retry_delay(self, attempt, response=None):
+        """Seconds to wait before the next attempt, or None if it shouldn't be retried"""
+        if response is not None and response.status_code == 429:
+            # Rate limited: only retry when the provider says when, and soon enough to be worth it
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is None or retry_after > self.max_retry_after:
+                return None
+            return retry_after
+        # Full jitter exponential backoff
+        return random.uniform(0, self.backoff * (2 ** attempt))
+
+    def get(self, url, quota_wait=None, **kwargs):
+        """GET through the circuit breaker; one outcome is recorded per call, after retries.
+
+        quota_wait caps how long to wait for a limiter slot (QuotaTimeoutError after that).
+        """
+        if self.breaker is not None and self.breaker.is_open():
+            raise CircuitOpenError(f"Circuit for {self.name} is open, skipping request")
+        # Queue for the quota before reserving a breaker slot, so the wait isn't timed
+        self._acquire(quota_wait)
+        if self.breaker is None:
+            return self._get_with_retries(url, **kwargs)[0]
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(f"Circuit for {self.name} is open, skipping request")
+        try:
+            response, upstream_seconds = self._get_with_retries(url, **kwargs)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        if response.status_code in RETRY_STATUS_CODES:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success(upstream_seconds)
+        return response
+
+    def _acquire(self, timeout=None):
+        if self.limiter is not None and not self.limiter.acquire(timeout=timeout):
+            raise QuotaTimeoutError(f"No {self.name} quota available within {timeout}s")
+
+    def get_cached(self, url, params=None, **kwargs):
+        """GET through the HTTP cache: reuse fresh bodies and revalidate stale ones"""
+        if self.http_cache is None:
+            return self.get(url, params=params, **kwargs)
+        key = self.http_cache.make_key(url, params)
+        record = self.http_cache.get(key)
+        if record is not None and time.time() < record.expires_at:
+            self.http_cache.count('fresh')
+            return CachedResponse(record, 'fresh')
+
+        headers = dict(kwargs.pop('headers', None) or {}, **self.http_cache.conditional_headers(record))
+        response = self.get(url, params=params, headers=headers, **kwargs)
+        if response.status_code == 200 or (response.status_code == 304 and record is not None):
+            stored, source = self.http_cache.store(key, record, response)
+            if stored is not None:
+                return CachedResponse(stored, source)
+        return response
+
+    def _get_with_retries(self, url, **kwargs):
+        """GET with default timeouts and jittered retries on transient failures.
+
+        The caller has already taken the first attempt's limiter slot. Returns the
+        response and the seconds spent in requests, excluding quota waits and backoff.
+        """
+        kwargs.setdefault('timeout', (self.connect_timeout, self.read_timeout))
+        attempt = 0
+        upstream_seconds = 0.0
+        while True:
+            if attempt:
+                self._acquire()
+            with self.lock:
+                self.counters['requests'] += 1
+            start_time = time.perf_counter()
+            try:
+                response = self.session.get(url, **kwargs)
+                elapsed = time.perf_counter() - start_time
+                upstream_seconds += elapsed
+                metrics.observe('upstream_request_duration_seconds', elapsed,
+                                'Duration of individual upstream HTTP requests',
+                                provider=self.name, status=response.status_code)
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.retries:
+                    return response, upstream_seconds
+                delay = self._retry_delay(attempt, response)
+                if delay is None:
+                    return response, upstream_seconds
+                logger.warning(f"{self.name} returned HTTP {response.status_code}, retrying in {delay:.1f}s")
+            except (requests.ConnectionError, requests.Timeout) as e:
+                upstream_seconds += time.perf_counter() - start_time
+                metrics.observe('upstream_request_duration_seconds', time.perf_counter() - start_time,
+                                'Duration of individual upstream HTTP requests',
+                                provider=self.name, status='error')
+                if attempt >= self.retries:
+                    with self.lock:
+                        self.counters['errors'] += 1
+                    raise
+                delay = self._retry_delay(attempt)
+                logger.warning(f"{self.name} request failed ({str(e)}), retrying")
+            with self.lock:
+                self.counters['retries'] += 1
+            time.sleep(delay)
+            attempt += 1
+
+    def stats(self):
+        """Request counters plus connection reuse from the urllib3 pools"""
+        connections = 0
+        pooled_requests = 0
+        for key in list(self.adapter.poolmanager.pools.keys()):
+            pool = self.adapter.poolmanager.pools.get(key)
+            if pool is None:
+                continue
+            connections += pool.num_connections
+            pooled_requests += pool.num_requests
+        with self.lock:
+            stats = dict(self.counters)
+        stats['connections_opened'] = connections
+        stats['connections_reused'] = max(0, pooled_requests - connections)
+        return stats
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def get_client(name, **kwargs):
+    """Return the shared client for a provider, creating it on first use"""
+    with _clients_lock:
+        client = _clients.get(name)
+        if client is None:
+            client = ProviderClient(name, **kwargs)
+            _clients[name] = client
+        return client
+
+def connection_stats():
+    """Connection and retry counters for every provider client"""
+    with _clients_lock:
+        clients = list(_clients.values())
+    return {client.name: client.stats() for client in clients}
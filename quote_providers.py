@@ -0,0 +1,116 @@
+from fetch_engine import fetch_concurrently
+import logging
+
+logger = logging.getLogger(__name__)
+
+def normalize_quote(price, previous_close=None, change_percent=None):
+    """Dashboard quote from a price plus either the previous close or a % change"""
+    if price is None:
+        return None
+    if change_percent is None:
+        change_percent = ((price - previous_close) / previous_close) * 100 if previous_close else 0
+    return {'price': round(price, 2), 'change': round(change_percent, 2)}
+
+class FinnhubQuoteProvider:
+    """One Finnhub /quote request per symbol, fanned out concurrently (the client enforces the quota)"""
+
+    name = 'finnhub'
+
+    def __init__(self, client, api_key, base_url='https://finnhub.io/api/v1', limiter=None, max_workers=8):
+        self.client = client
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.limiter = limiter
+        self.max_workers = max_workers
+
+    def _get(self, symbol, **kwargs):
+        return self.client.get(f"{self.base_url}/quote?symbol={symbol}",
+                               headers={'X-Finnhub-Token': self.api_key}, **kwargs)
+
+    def fetch_quote(self, symbol):
+        """Fetch a single real-time quote; None if it could not be fetched"""
+        try:
+            response = self._get(symbol)
+            if response.status_code == 200:
+                data = response.json()
+                if data.get('c') is not None:  # Current price
+                    return normalize_quote(data['c'], previous_close=data.get('pc'))
+                logger.error(f"No quote data found for {symbol}")
+            else:
+                logger.error(f"Error fetching {symbol}: HTTP {response.status_code}")
+        except Exception as e:
+            logger.error(f"Error fetching {symbol}: {str(e)}")
+        return None
+
+    def get_quotes(self, symbols):
+        """Return {symbol: quote or None}"""
+        return fetch_concurrently(self.fetch_quote, symbols, max_workers=self.max_workers, limiter=self.limiter)
+
+    def probe(self, symbol='AAPL', quota_wait=5):
+        # Don't hold a live health check for up to a minute while refreshes use the quota
+        response = self._get(symbol, timeout=10, quota_wait=quota_wait)
+        return {
+            'status': 'healthy' if response.status_code == 200 else 'error',
+            'provider': self.name,
+            'code': response.status_code,
+            'response': response.json() if response.status_code == 200 else response.text
+        }
+
+class BatchQuoteProvider:
+    """Quotes for many symbols per request from a batch quote endpoint.
+
+    Speaks the common `GET <url>/AAPL,MSFT,...?apikey=KEY` shape that returns a
+    list of {symbol, price, changesPercentage | previousClose} objects, so a
+    board of hundreds of symbols costs a handful of requests per refresh.
+    """
+
+    name = 'batch'
+
+    def __init__(self, client, url, api_key=None, batch_size=100, limiter=None, max_workers=4):
+        self.client = client
+        self.url = url.rstrip('/')
+        self.api_key = api_key
+        self.batch_size = batch_size
+        self.limiter = limiter
+        self.max_workers = max_workers
+
+    def _get(self, symbols, **kwargs):
+        params = {'apikey': self.api_key} if self.api_key else None
+        return self.client.get(f"{self.url}/{','.join(symbols)}", params=params, **kwargs)
+
+    def fetch_batch(self, symbols):
+        """Fetch one batch; returns {symbol: quote} for the symbols the provider knew"""
+        try:
+            response = self._get(symbols)
+            if response.status_code != 200:
+                logger.error(f"Batch quote request for {len(symbols)} symbols failed: HTTP {response.status_code}")
+                return {}
+            quotes = {}
+            for item in response.json() or []:
+                quote = normalize_quote(item.get('price'), previous_close=item.get('previousClose'),
+                                        change_percent=item.get('changesPercentage'))
+                if item.get('symbol') and quote:
+                    quotes[item['symbol']] = quote
+            return quotes
+        except Exception as e:
+            logger.error(f"Error fetching batch of {len(symbols)} quotes: {str(e)}")
+            return {}
+
+    def get_quotes(self, symbols):
+        """Return {symbol: quote or None}"""
+        symbols = list(symbols)
+        batches = [tuple(symbols[i:i + self.batch_size]) for i in range(0, len(symbols), self.batch_size)]
+        results = fetch_concurrently(self.fetch_batch, batches, max_workers=self.max_workers, limiter=self.limiter)
+        quotes = {}
+        for batch in batches:
+            quotes.update(results.get(batch) or {})
+        return {symbol: quotes.get(symbol) for symbol in symbols}
+
+    def probe(self, symbol='AAPL'):
+        response = self._get([symbol], timeout=10)
+        return {
+            'status': 'healthy' if response.status_code == 200 else 'error',
+            'provider': self.name,
+            'code': response.status_code,
+            'response': response.json() if response.status_code == 200 else response.text
+        }
@@ -0,0 +1,177 @@
+from collections import OrderedDict
+from datetime import datetime, timezone
+import threading
+import time
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+class RefreshFailed(Exception):
+    """Raised by a refresher whose fetch failed, after it has recorded the failure"""
+
+def _isoformat(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat() if timestamp else None
+
+class Flight:
+    """One in-flight refresh of a provider, shared by every caller that asked for it"""
+
+    def __init__(self, provider):
+        self.provider = provider
+        self.state = 'queued'
+        self.error = None
+        self.queued_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.done = threading.Event()
+
+    def describe(self):
+        return {
+            'state': self.state,
+            'error': self.error,
+            'queued_at': _isoformat(self.queued_at),
+            'started_at': _isoformat(self.started_at),
+            'finished_at': _isoformat(self.finished_at)
+        }
+
+class RefreshJobs:
+    """Single-flight provider refreshes.
+
+    At most one refresh per provider runs at a time: a trigger or scheduled run
+    for a provider that is already queued or running joins that flight instead
+    of starting another. Triggered refreshes are handed to `submit` and get a
+    job id whose progress can be polled.
+
+    Refreshers are called as refresher(force) and may return False to report
+    that they skipped the fetch (e.g. while backing off), or raise (RefreshFailed
+    for a failure they already handled) to end the flight as 'failed'.
+
+    A provider triggered again within min_interval seconds of its last triggered
+    refresh is reported as 'skipped' instead of fetching again.
+    """
+
+    def __init__(self, refreshers, submit, max_jobs=200, min_interval=0):
+        self.refreshers = refreshers  # provider -> callable
+        self.submit = submit  # submit(func, name) runs func in the background
+        self.max_jobs = max_jobs
+        self.min_interval = min_interval
+        self.lock = threading.Lock()
+        self.inflight = {}  # provider -> Flight
+        self.last_triggered = {}  # provider -> time its last triggered refresh was queued
+        self.jobs = OrderedDict()  # job id -> {'created_at', 'flights': {provider: Flight}}
+        self.counters = {'started': 0, 'coalesced': 0, 'throttled': 0}
+
+    def _join_or_create(self, provider):
+        """Return (flight, created); caller must hold self.lock"""
+        flight = self.inflight.get(provider)
+        if flight is not None:
+            self.counters['coalesced'] += 1
+            return flight, False
+        flight = Flight(provider)
+        self.inflight[provider] = flight
+        self.counters['started'] += 1
+        return flight, True
+
+    def _execute(self, flight, force=False):
+        flight.state = 'running'
+        flight.started_at = time.time()
+        try:
+            skipped = self.refreshers[flight.provider](force) is False
+            flight.state = 'skipped' if skipped else 'succeeded'
+        except Exception as e:
+            if not isinstance(e, RefreshFailed):
+                logger.error(f"Refresh of {flight.provider} failed: {str(e)}")
+            flight.state = 'failed'
+            flight.error = str(e)
+        finally:
+            flight.finished_at = time.time()
+            with self.lock:
+                if self.inflight.get(flight.provider) is flight:
+                    del self.inflight[flight.provider]
+            flight.done.set()
+
+    def run(self, provider, force=False):
+        """Refresh a provider now, or wait for the refresh already in flight"""
+        with self.lock:
+            flight, created = self._join_or_create(provider)
+        if created:
+            self._execute(flight, force)
+        else:
+            flight.done.wait()
+
+    def trigger(self, providers, force=False, job_id=None, now=None):
+        """Queue refreshes for providers and return the job id (a new one unless given)"""
+        job_id = job_id or uuid.uuid4().hex
+        now = now or time.time()
+        to_submit = []
+        with self.lock:
+            flights = {}
+            for provider in providers:
+                if provider not in self.inflight and now - self.last_triggered.get(provider, 0) < self.min_interval:
+                    flights[provider] = self._throttled(provider)
+                    continue
+                flight, created = self._join_or_create(provider)
+                flights[provider] = flight
+                if created:
+                    self.last_triggered[provider] = now
+                    to_submit.append(flight)
+            self.jobs[job_id] = {'created_at': time.time(), 'flights': flights}
+            while len(self.jobs) > self.max_jobs:
+                self.jobs.popitem(last=False)
+        for flight in to_submit:
+            try:
+                self.submit(lambda flight=flight: self._execute(flight, force), f'refresh-{flight.provider}')
+            except Exception as e:
+                logger.error(f"Could not queue {flight.provider} refresh: {str(e)}")
+                self._abandon(flight, str(e))
+        return job_id
+
+    def _throttled(self, provider):
+        """A finished 'skipped' flight for a provider triggered too recently; caller holds self.lock"""
+        self.counters['throttled'] += 1
+        flight = Flight(provider)
+        flight.state = 'skipped'
+        flight.error = f"Refreshed less than {self.min_interval}s ago"
+        flight.finished_at = flight.queued_at
+        flight.done.set()
+        return flight
+
+    def _abandon(self, flight, error):
+        flight.state = 'failed'
+        flight.error = error
+        flight.finished_at = time.time()
+        with self.lock:
+            if self.inflight.get(flight.provider) is flight:
+                del self.inflight[flight.provider]
+        flight.done.set()
+
+    def status(self, job_id):
+        """Progress of a triggered job, or None if the id is unknown or expired"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        providers = {provider: flight.describe() for provider, flight in job['flights'].items()}
+        states = {flight['state'] for flight in providers.values()}
+        if states & {'queued', 'running'}:
+            state = 'running' if 'running' in states else 'queued'
+        elif 'failed' in states:
+            state = 'failed'
+        else:
+            state = 'skipped' if 'skipped' in states else 'succeeded'
+        return {
+            'job_id': job_id,
+            'status': state,
+            'created_at': _isoformat(job['created_at']),
+            'providers': providers
+        }
+
+    def stats(self):
+        with self.lock:
+            return {
+                'in_flight': sorted(self.inflight),
+                'jobs_tracked': len(self.jobs),
+                'started': self.counters['started'],
+                'coalesced': self.counters['coalesced'],
+                'throttled': self.counters['throttled']
+            }
@@ -0,0 +1,67 @@
+"""Failure-rate circuit breaker in circuit_breaker.py"""
+import pytest
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+def make_breaker(**kwargs):
+    settings = dict(failure_rate=0.5, minimum_calls=4, window=10, open_seconds=60, half_open_calls=1)
+    settings.update(kwargs)
+    return CircuitBreaker('test', **settings)
+
+def open_breaker(breaker, now=1000):
+    for _ in range(breaker.minimum_calls):
+        breaker.record_failure(now=now)
+    assert breaker.state == OPEN
+
+def test_stays_closed_below_minimum_calls():
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.record_failure(now=1000)
+    assert breaker.state == CLOSED
+    assert breaker.allow_request(now=1000)
+
+def test_opens_at_the_failure_rate():
+    breaker = make_breaker()
+    breaker.record_success(now=1000)
+    breaker.record_success(now=1000)
+    breaker.record_failure(now=1000)
+    assert breaker.state == CLOSED
+    breaker.record_failure(now=1000)
+    assert breaker.state == OPEN
+    assert not breaker.allow_request(now=1059)
+    assert breaker.status(now=1030)['retry_in_seconds'] == 30
+    assert breaker.status()['rejected'] == 1
+
+def test_half_open_trial_success_closes():
+    breaker = make_breaker()
+    open_breaker(breaker)
+    assert breaker.allow_request(now=1060)
+    assert breaker.state == HALF_OPEN
+    # Only half_open_calls trials at a time
+    assert breaker.is_open(now=1060)
+    assert not breaker.allow_request(now=1060)
+    breaker.record_success(now=1061)
+    assert breaker.state == CLOSED
+    assert breaker.status()['recent_calls'] == 1
+
+def test_half_open_trial_failure_reopens():
+    breaker = make_breaker()
+    open_breaker(breaker)
+    assert breaker.allow_request(now=1060)
+    breaker.record_failure(now=1061)
+    assert breaker.state == OPEN
+    assert not breaker.allow_request(now=1120)
+    assert breaker.allow_request(now=1121)
+    assert breaker.status()['opened'] == 2
+
+def test_slow_calls_count_as_failures():
+    breaker = make_breaker(slow_call_seconds=2)
+    breaker.record_success(duration=1, now=1000)
+    breaker.record_success(duration=3, now=1000)
+    assert breaker.status()['failure_rate'] == 0.5
+
+def test_call_fails_fast_while_open():
+    breaker = make_breaker()
+    open_breaker(breaker, now=None)
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: 'not called')
@@ -0,0 +1,120 @@
+"""Quote providers against the fake upstream server in benchmarks/fake_providers.py"""
+import time
+
+import pytest
+
+from circuit_breaker import CircuitBreaker
+from benchmarks.fake_providers import fake_price, start_fake_server
+from fetch_engine import SlidingWindowLimiter
+from provider_client import ProviderClient, QuotaTimeoutError
+from quote_providers import BatchQuoteProvider, FinnhubQuoteProvider
+
+SYMBOLS = ['AAPL', 'MSFT', 'NVDA']
+
+@pytest.fixture
+def fake_server():
+    servers = []
+
+    def start(**settings):
+        server, base_url = start_fake_server(**settings)
+        servers.append(server)
+        return server, base_url
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+def make_client(**kwargs):
+    # No backoff sleeps; 429s come back straight away instead of waiting for the next quota window
+    kwargs.setdefault('backoff', 0)
+    return ProviderClient('test', max_retry_after=0, **kwargs)
+
+def finnhub(base_url, **kwargs):
+    return FinnhubQuoteProvider(make_client(**kwargs), 'test', base_url=f'{base_url}/api/v1')
+
+def batch(base_url, batch_size=100, **kwargs):
+    return BatchQuoteProvider(make_client(**kwargs), f'{base_url}/api/v3/quote', api_key='test',
+                              batch_size=batch_size)
+
+def assert_quotes(quotes, symbols):
+    assert sorted(quotes) == sorted(symbols)
+    for symbol, quote in quotes.items():
+        # Prices drift around the previous close by at most 2%
+        previous_close = fake_price(symbol)[1]
+        assert quote['price'] == pytest.approx(previous_close, rel=0.021)
+        assert abs(quote['change']) <= 2.01
+
+def test_finnhub_fetches_one_quote_per_symbol(fake_server):
+    server, base_url = fake_server()
+    quotes = finnhub(base_url).get_quotes(SYMBOLS)
+    assert_quotes(quotes, SYMBOLS)
+    assert server.counts == {'finnhub': len(SYMBOLS)}
+
+def test_finnhub_returns_none_for_failed_symbols(fake_server):
+    server, base_url = fake_server(error_rate=1)
+    quotes = finnhub(base_url, retries=1).get_quotes(SYMBOLS)
+    assert quotes == {symbol: None for symbol in SYMBOLS}
+    assert server.requests == len(SYMBOLS) * 2
+
+def test_finnhub_does_not_retry_into_an_exhausted_quota(fake_server):
+    server, base_url = fake_server(quota=2)
+    quotes = finnhub(base_url).get_quotes(SYMBOLS)
+    assert sum(quote is not None for quote in quotes.values()) == 2
+    assert server.throttled == 1
+    assert server.requests == len(SYMBOLS)
+
+def test_finnhub_quota_waits_do_not_count_as_slow_calls(fake_server):
+    server, base_url = fake_server()
+    # Four windows' worth of symbols: most calls queue far longer than the slow-call threshold
+    limiter = SlidingWindowLimiter(calls_per_minute=5, period=0.5)
+    breaker = CircuitBreaker('test', minimum_calls=2, slow_call_seconds=0.2)
+    symbols = [f'SYM{i:03d}' for i in range(20)]
+    quotes = finnhub(base_url, limiter=limiter, breaker=breaker).get_quotes(symbols)
+    assert_quotes(quotes, symbols)
+    assert breaker.status()['state'] == 'closed'
+    assert server.requests == len(symbols)
+
+def test_finnhub_probe_gives_up_waiting_for_quota(fake_server):
+    server, base_url = fake_server()
+    limiter = SlidingWindowLimiter(calls_per_minute=1)
+    limiter.acquire()
+    start = time.monotonic()
+    with pytest.raises(QuotaTimeoutError):
+        finnhub(base_url, limiter=limiter).probe(quota_wait=0.1)
+    assert time.monotonic() - start < 1
+    assert server.requests == 0
+
+def test_finnhub_probe(fake_server):
+    _, base_url = fake_server()
+    probe = finnhub(base_url).probe()
+    assert probe['status'] == 'healthy'
+    assert probe['provider'] == 'finnhub'
+    assert probe['response']['c'] is not None
+
+def test_batch_splits_symbols_into_batches(fake_server):
+    server, base_url = fake_server()
+    symbols = [f'SYM{i:03d}' for i in range(250)]
+    quotes = batch(base_url, batch_size=100).get_quotes(symbols)
+    assert_quotes(quotes, symbols)
+    assert server.requests == 3
+
+def test_batch_returns_none_for_failed_batches(fake_server):
+    server, base_url = fake_server(error_rate=1)
+    quotes = batch(base_url, batch_size=2, retries=0).get_quotes(SYMBOLS)
+    assert quotes == {symbol: None for symbol in SYMBOLS}
+    assert server.requests == 2
+
+def test_batch_keeps_quotes_from_batches_under_quota(fake_server):
+    server, base_url = fake_server(quota=1)
+    provider = batch(base_url, batch_size=2)
+    provider.max_workers = 1  # the first batch takes the quota
+    quotes = provider.get_quotes(SYMBOLS)
+    assert_quotes({symbol: quotes[symbol] for symbol in SYMBOLS[:2]}, SYMBOLS[:2])
+    assert quotes['NVDA'] is None
+    assert server.throttled == 1
+
+def test_batch_probe_reports_errors(fake_server):
+    _, base_url = fake_server(error_rate=1)
+    probe = batch(base_url, retries=0).probe()
+    assert probe['status'] == 'error'
+    assert probe['code'] == 503
@@ -0,0 +1,56 @@
+"""Sliding-window rate limiting in middleware.py and its SQLite backend"""
+from coordination import SQLiteRateLimitBackend
+from middleware import RateLimiter, sliding_window_acquire
+
+def allowed(acquire, count):
+    """How many of count calls to acquire() were let through"""
+    return sum(bool(acquire()) for _ in range(count))
+
+def test_limit_within_one_window():
+    state = [0, 0, 0]
+    assert allowed(lambda: sliding_window_acquire(state, 10, 3, 60), 5) == 3
+    assert state == [0, 3, 0]
+
+def test_previous_window_is_weighted_by_its_overlap():
+    state = [0, 0, 0]
+    allowed(lambda: sliding_window_acquire(state, 10, 3, 60), 3)
+    # At the start of the next window the previous one still counts in full
+    assert not sliding_window_acquire(state, 60, 3, 60)
+    # Halfway through it counts as 1.5, leaving room for two more requests
+    assert allowed(lambda: sliding_window_acquire(state, 90, 3, 60), 3) == 2
+    assert state == [1, 2, 3]
+
+def test_rollover_after_an_idle_window_forgets_old_counts():
+    state = [0, 3, 0]
+    assert allowed(lambda: sliding_window_acquire(state, 150, 3, 60), 3) == 3
+    assert state == [2, 3, 0]
+
+def test_keys_are_limited_independently():
+    limiter = RateLimiter(requests_per_minute=2)
+    assert allowed(lambda: limiter.is_allowed('10.0.0.1', now=1000), 3) == 2
+    assert limiter.is_allowed('10.0.0.2', now=1000)
+
+def test_idle_keys_are_swept_after_two_windows():
+    limiter = RateLimiter(requests_per_minute=2, shards=1)
+    limiter.is_allowed('10.0.0.1', now=6000)
+    limiter.is_allowed('10.0.0.2', now=6060)
+    assert set(limiter.shards[0]) == {'10.0.0.1', '10.0.0.2'}
+    limiter.is_allowed('10.0.0.2', now=6120)
+    assert set(limiter.shards[0]) == {'10.0.0.2'}
+
+def test_sqlite_backend_shares_counts_between_workers(tmp_path):
+    path = str(tmp_path / 'ratelimit.sqlite3')
+    first, second = SQLiteRateLimitBackend(path), SQLiteRateLimitBackend(path)
+    assert first.acquire('10.0.0.1', 10, 3, 60)
+    assert second.acquire('10.0.0.1', 11, 3, 60)
+    assert first.acquire('10.0.0.1', 12, 3, 60)
+    assert not second.acquire('10.0.0.1', 13, 3, 60)
+    assert allowed(lambda: first.acquire('10.0.0.1', 90, 3, 60), 3) == 2
+
+def test_sqlite_backend_expires_idle_keys(tmp_path):
+    backend = SQLiteRateLimitBackend(str(tmp_path / 'ratelimit.sqlite3'))
+    backend.acquire('10.0.0.1', 0, 3, 60)
+    backend.acquire('10.0.0.2', 60, 3, 60)
+    backend.acquire('10.0.0.2', 120, 3, 60)
+    keys = {row[0] for row in backend.conn.execute('SELECT key FROM rate_limits')}
+    assert keys == {'10.0.0.2'}
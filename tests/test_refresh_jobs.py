@@ -0,0 +1,86 @@
+"""Single-flight refreshes in refresh_jobs.py"""
+import threading
+
+from refresh_jobs import RefreshFailed, RefreshJobs
+
+def make_jobs(refresher, min_interval=0):
+    """RefreshJobs for one 'news' provider whose submitted refreshes wait in a list until run"""
+    pending = []
+    jobs = RefreshJobs({'news': refresher}, lambda func, name: pending.append(func), min_interval=min_interval)
+    return jobs, pending
+
+def run_pending(pending):
+    while pending:
+        pending.pop(0)()
+
+def test_concurrent_triggers_share_one_flight():
+    calls = []
+    jobs, pending = make_jobs(lambda force: calls.append(force))
+    first = jobs.trigger(['news'], force=True)
+    second = jobs.trigger(['news'])
+    assert len(pending) == 1
+    assert jobs.status(first)['status'] == 'queued'
+    run_pending(pending)
+    assert calls == [True]
+    assert jobs.status(first)['status'] == jobs.status(second)['status'] == 'succeeded'
+    assert jobs.stats()['started'] == 1
+    assert jobs.stats()['coalesced'] == 1
+
+def test_run_waits_for_the_flight_in_progress():
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def refresher(force):
+        calls.append(force)
+        started.set()
+        release.wait(5)
+    jobs, _ = make_jobs(refresher)
+    first = threading.Thread(target=jobs.run, args=('news',))
+    first.start()
+    started.wait(5)
+    joined = threading.Thread(target=jobs.run, args=('news',))
+    joined.start()
+    joined.join(0.1)
+    assert joined.is_alive()
+    release.set()
+    first.join(5)
+    joined.join(5)
+    assert calls == [False]
+    assert jobs.stats() == {'in_flight': [], 'jobs_tracked': 0, 'started': 1, 'coalesced': 1, 'throttled': 0}
+
+def test_refresh_outcomes():
+    for result, state in ((None, 'succeeded'), (False, 'skipped')):
+        jobs, pending = make_jobs(lambda force: result)
+        job_id = jobs.trigger(['news'])
+        run_pending(pending)
+        assert jobs.status(job_id)['status'] == state
+
+def test_failed_refresh_reports_its_error():
+    def refresher(force):
+        raise RefreshFailed('News API returned no data')
+    jobs, pending = make_jobs(refresher)
+    job_id = jobs.trigger(['news'])
+    run_pending(pending)
+    status = jobs.status(job_id)
+    assert status['status'] == 'failed'
+    assert status['providers']['news']['error'] == 'News API returned no data'
+
+def test_triggers_within_min_interval_are_skipped():
+    calls = []
+    jobs, pending = make_jobs(lambda force: calls.append(force), min_interval=60)
+    jobs.trigger(['news'], now=1000)
+    run_pending(pending)
+    throttled = jobs.trigger(['news'], now=1030)
+    assert not pending
+    assert jobs.status(throttled)['status'] == 'skipped'
+    jobs.trigger(['news'], now=1061)
+    run_pending(pending)
+    assert len(calls) == 2
+    assert jobs.stats()['throttled'] == 1
+
+def test_trigger_joins_a_running_flight_inside_min_interval():
+    jobs, pending = make_jobs(lambda force: None, min_interval=60)
+    first = jobs.trigger(['news'], now=1000)
+    second = jobs.trigger(['news'], now=1001)
+    run_pending(pending)
+    assert jobs.status(first)['status'] == jobs.status(second)['status'] == 'succeeded'
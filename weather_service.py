@@ -0,0 +1,171 @@
+from fetch_engine import fetch_concurrently
+import json
+import os
+import re
+import tempfile
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+def slugify(name):
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
+
+def parse_locations(spec):
+    """WEATHER_LOCATIONS, e.g. "Mooresville, NC;London;Tokyo" -> [{slug, name}] (first is the default)"""
+    locations = []
+    seen = set()
+    for name in (spec or '').split(';'):
+        name = name.strip()
+        slug = slugify(name)
+        if slug and slug not in seen:
+            seen.add(slug)
+            locations.append({'slug': slug, 'name': name})
+    return locations
+
+def normalize_weather(weather_data):
+    """Dashboard weather fields from an OpenWeatherMap response"""
+    temp_c = round(weather_data['main']['temp'])
+    temp_f = round((temp_c * 9/5) + 32)
+    return {
+        'city': weather_data['name'],
+        'temperature_c': temp_c,
+        'temperature_f': temp_f,
+        'description': weather_data['weather'][0]['description'],
+        'humidity': weather_data['main']['humidity'],
+        'wind_speed': weather_data['wind']['speed']
+    }
+
+class Geocoder:
+    """Resolves place names to coordinates once; results are kept in a JSON file"""
+
+    def __init__(self, client, api_key, base_url='http://api.openweathermap.org', path=None):
+        self.client = client
+        self.api_key = api_key
+        self.base_url = base_url.rstrip('/')
+        self.path = path
+        self.lock = threading.Lock()
+        self.places = self._load()
+
+    def _load(self):
+        if not self.path:
+            return {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.error(f"Ignoring unreadable geocode cache: {str(e)}")
+            return {}
+
+    def _save(self):
+        if not self.path:
+            return
+        try:
+            with self.lock:
+                places = dict(self.places)
+            handle = tempfile.NamedTemporaryFile('w', dir=os.path.dirname(self.path) or '.',
+                                                 delete=False, encoding='utf-8')
+            with handle:
+                json.dump(places, handle)
+            os.replace(handle.name, self.path)
+        except Exception as e:
+            logger.error(f"Error saving geocode cache: {str(e)}")
+
+    def resolve(self, name):
+        """Return {'lat', 'lon'} for a place name, or None if it can't be resolved"""
+        with self.lock:
+            place = self.places.get(name)
+        if place is not None:
+            return place
+        try:
+            response = self.client.get(f"{self.base_url}/geo/1.0/direct",
+                                       params={'q': name, 'limit': 1, 'appid': self.api_key})
+            if response.status_code != 200:
+                logger.error(f"Geocoding {name} failed: HTTP {response.status_code}")
+                return None
+            results = response.json()
+            if not results:
+                logger.error(f"No coordinates found for {name}")
+                return None
+            place = {'lat': round(results[0]['lat'], 4), 'lon': round(results[0]['lon'], 4)}
+        except Exception as e:
+            logger.error(f"Error geocoding {name}: {str(e)}")
+            return None
+        with self.lock:
+            self.places[name] = place
+        self._save()
+        logger.info(f"Resolved {name} to {place['lat']}, {place['lon']}")
+        return place
+
+class WeatherService:
+    """Current weather for many locations, fetched concurrently.
+
+    Locations are resolved to coordinates once, and readings are cached per
+    coordinate pair, so locations that resolve to the same place share one
+    request and a failed fetch keeps that location's last good reading.
+    """
+
+    def __init__(self, client, api_key, locations, geocoder, base_url='http://api.openweathermap.org',
+                 max_workers=8):
+        self.client = client
+        self.api_key = api_key
+        self.locations = locations
+        self.geocoder = geocoder
+        self.base_url = base_url.rstrip('/')
+        self.max_workers = max_workers
+        self.lock = threading.Lock()
+        self.readings = {}  # coordinate key -> last good reading
+
+    @staticmethod
+    def coord_key(place):
+        return f"{place['lat']:.4f},{place['lon']:.4f}"
+
+    def _query(self, slug):
+        """(cache key, request params); falls back to a name query if geocoding fails"""
+        location = next(location for location in self.locations if location['slug'] == slug)
+        place = self.geocoder.resolve(location['name'])
+        if place is None:
+            return f"q:{location['name']}", {'q': location['name']}
+        return self.coord_key(place), {'lat': place['lat'], 'lon': place['lon']}
+
+    def fetch(self, params):
+        """Normalized reading for one request, or None"""
+        response = self.client.get_cached(f"{self.base_url}/data/2.5/weather",
+                                          params=dict(params, appid=self.api_key, units='metric'))
+        if response.status_code != 200:
+            logger.error(f"Weather API error: {response.status_code}")
+            logger.error(f"Response content: {response.text}")
+            return None
+        if hasattr(response, 'memo'):
+            # Only re-parsed and re-normalized when the upstream body changes
+            return response.memo('weather', normalize_weather)
+        return normalize_weather(response.json())
+
+    def refresh(self):
+        """Fetch every location; returns {'default', 'locations': {slug: reading}} or None"""
+        # Geocoding only hits the network the first time each place is seen
+        resolved = fetch_concurrently(self._query, [location['slug'] for location in self.locations],
+                                      max_workers=self.max_workers)
+        queries = {slug: query for slug, query in resolved.items() if query is not None}
+        requests_by_key = {key: params for key, params in queries.values()}
+        results = fetch_concurrently(lambda key: self.fetch(requests_by_key[key]), list(requests_by_key),
+                                     max_workers=self.max_workers)
+
+        readings = {}
+        with self.lock:
+            for key, reading in results.items():
+                if reading is not None:
+                    self.readings[key] = reading
+            for location in self.locations:
+                if location['slug'] not in queries:
+                    continue
+                key = queries[location['slug']][0]
+                reading = self.readings.get(key)
+                if reading is not None:
+                    readings[location['slug']] = dict(reading, city=location['name'], stale=results.get(key) is None)
+        if not readings:
+            return None
+        logger.info(f"Fetched weather for {len(readings)}/{len(self.locations)} locations")
+        return {'default': self.locations[0]['slug'], 'locations': readings}